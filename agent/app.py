@@ -19,7 +19,12 @@ External dependencies:
 """
 import asyncio
 import json
+import logging
 import os
+import sys
+import threading
+
+import orjson
 
 from mcp import Resource
 from mcp.types import Prompt
@@ -29,6 +34,19 @@ from agent.dial_client import DialClient
 from agent.models.message import Message, Role
 from agent.prompts import SYSTEM_PROMPT
 
+# Tools with these name prefixes are treated as read-only and their results are cached
+CACHEABLE_TOOL_PREFIXES = ("get_", "list_", "search_")
+
+# History compaction: once history exceeds MAX_HISTORY messages, everything between the
+# initial preamble (system prompt + MCP prompts) and the last KEEP_TAIL messages is
+# replaced by a single LLM-generated summary message
+MAX_HISTORY = 40
+KEEP_TAIL = 10
+
+# Speculative prefetch: while the user types, re-warm up to PREFETCH_LIMIT of the most recent
+# read-only tool calls (e.g. after an update cleared the cache) so a repeat is a cache hit
+PREFETCH_LIMIT = 3
+
 
 async def main():
     """
@@ -43,10 +61,16 @@ async def main():
     Environment variables (REQUIRED):
     - DIAL_API_KEY: Azure OpenAI API key for authentication
     - DIAL_API_ENDPOINT (optional): Azure OpenAI endpoint; defaults to placeholder if not set
+    - LOG_LEVEL (optional): Level for client diagnostics (e.g. DEBUG); defaults to WARNING
     
     Raises:
     - RuntimeError if MCP server is unreachable or DIAL_API_KEY is not set
     """
+    # Client diagnostics (MCPClient/DialClient) go through logging; DEBUG shows per-tool details
+    logging.basicConfig(
+        level=os.environ.get("LOG_LEVEL", "WARNING").upper(),
+        format="[%(name)s] %(levelname)s: %(message)s"
+    )
     print("[App] Starting User Management Agent...")
     
     # Configuration: MCP server and DIAL API endpoints
@@ -56,18 +80,25 @@ async def main():
 
     # STEP 1: Connect to MCP server (async context manager ensures cleanup on exit)
     async with MCPClient(mcp_server_url) as mcp_client:
-        # Discover available resources (e.g., flow diagrams, API documentation)
-        # Note: Not all MCP servers provide resources; graceful fallback to empty list in MCPClient
-        resources = await mcp_client.get_resources()
+        # Discover resources, tools and prompts concurrently (independent reads: ~1 RTT instead of 3)
+        # - Resources (e.g., flow diagrams): not all MCP servers provide them; MCPClient falls back to []
+        # - Tools (CRUD operations on users) in DIAL format: passed to LLM so it can decide when/how to call them
+        # - Prompts (e.g., search helper, profile creation guide): added to history in STEP 3
+        resources, tools, prompts = await asyncio.gather(
+            mcp_client.get_resources(),
+            mcp_client.get_tools(),
+            mcp_client.get_prompts(),
+        )
         print(f"[App] MCP Resources: {[r.uri for r in resources]}")
-
-        # Discover available tools (CRUD operations on users) and transform to DIAL format
-        # These tools are passed to LLM so it can decide when/how to call them
-        tools = await mcp_client.get_tools()
         print(f"[App] MCP Tools: {[t['function']['name'] for t in tools]}")
+        # Read-only tools are idempotent within a session: let repeated calls hit the cache
+        mcp_client.enable_cache(
+            t["function"]["name"] for t in tools
+            if t["function"]["name"].startswith(CACHEABLE_TOOL_PREFIXES)
+        )
 
         # STEP 2: Initialize DIAL client (LLM orchestrator) with discovered tools
-        # DIAL client will handle streaming responses and tool call recursion
+        # DIAL client will handle streaming responses and the tool call loop
         dial_client = DialClient(
             api_key=dial_api_key,
             endpoint=dial_endpoint,
@@ -81,7 +112,6 @@ async def main():
 
         # Add MCP server prompts to message history (e.g., search helper, profile creation guide)
         # These provide LLM with best practices for using the tools
-        prompts = await mcp_client.get_prompts()
         for prompt in prompts:
             # Use description if available; fall back to name
             messages.append(Message(role=Role.USER, content=prompt.description or prompt.name))
@@ -89,36 +119,191 @@ async def main():
         print("[App] User Management Agent is ready. Type your message (type 'exit', 'quit', or 'q' to stop):")
 
         # STEP 4: Interactive chat loop - accept user input and maintain conversation
-        while True:
-            # Read user input from console (blocking; no timeout)
-            user_input = input("You: ").strip()
-            
-            # Exit gracefully on quit commands
-            if user_input.lower() in {"exit", "quit", "q"}:
-                print("[App] Exiting chat. Goodbye!")
-                break
-            
-            # Skip empty input (user just pressed Enter)
-            if not user_input:
-                continue
-            
-            # Add user message to conversation history (preserved across iterations)
-            messages.append(Message(role=Role.USER, content=user_input))
-            
-            # Send message to LLM and get response (with automatic tool call handling)
-            # DialClient.get_completion() recursively calls LLM until no tool calls remain
-            try:
-                ai_message = await dial_client.get_completion(messages)
-                messages.append(ai_message)
-                # Conversation continues in next iteration with full history intact
-            except Exception as e:
-                # Error handling: log issue but don't crash loop - user can retry
-                # This allows recovery from transient API failures or network issues
-                import traceback
-                print(f"[App] Error: {type(e).__name__}: {e}")
-                traceback.print_exc()
+        try:
+            # Everything built so far is the stable preamble; compaction never touches it
+            await chat_loop(dial_client, mcp_client, messages, preamble_len=len(messages))
+        finally:
+            # Release pooled DIAL connections before the MCP session closes
+            await dial_client.aclose()
+
+
+async def compact_history(dial_client: DialClient, messages: list[Message], preamble_len: int):
+    """
+    Keep per-turn request size bounded by summarizing old turns.
+    
+    When history grows past MAX_HISTORY, messages between the preamble and the last
+    KEEP_TAIL messages are collapsed into one SYSTEM summary message. The preamble is kept
+    verbatim so the request prefix stays stable (friendly to provider-side prompt caching).
+    
+    Args:
+        dial_client: DialClient used to generate the summary
+        messages: Conversation history; compacted in place
+        preamble_len: Number of leading messages (system prompt + MCP prompts) to keep as-is
+    """
+    if len(messages) <= MAX_HISTORY:
+        return
+
+    tail_start = len(messages) - KEEP_TAIL
+    # A TOOL result must stay right after the AI message that requested it
+    while tail_start > preamble_len and messages[tail_start].role == Role.TOOL:
+        tail_start -= 1
+    if tail_start <= preamble_len:
+        return
+
+    summary = await dial_client.summarize(messages[preamble_len:tail_start])
+    messages[preamble_len:tail_start] = [
+        Message(role=Role.SYSTEM, content=f"Prior conversation summary: {summary}")
+    ]
+    print(f"[App] Compacted conversation history to {len(messages)} messages.")
+
+
+async def speculative_prefetch(mcp_client: MCPClient, messages: list[Message]):
+    """
+    Re-execute recent read-only tool calls in the background to warm the MCPClient cache.
+    
+    Runs during user think-time. Picks the most recent distinct cacheable tool calls from
+    history; MCPClient.warm_cache() skips anything already cached, so this only costs
+    network time after a mutation invalidated the cache.
+    
+    Args:
+        mcp_client: Connected MCPClient (with caching enabled)
+        messages: Conversation history to inspect (read-only)
+    """
+    candidates: dict[tuple[str, str], dict] = {}
+    for message in reversed(messages):
+        if message.role != Role.AI or not message.tool_calls:
+            continue
+        for tool_call in message.tool_calls:
+            function = tool_call["function"]
+            key = (function["name"], function["arguments"])
+            if key not in candidates and function["name"].startswith(CACHEABLE_TOOL_PREFIXES):
+                candidates[key] = function
+        if len(candidates) >= PREFETCH_LIMIT:
+            break
+
+    coros = []
+    for function in list(candidates.values())[:PREFETCH_LIMIT]:
+        try:
+            tool_args = orjson.loads(function["arguments"])
+        except orjson.JSONDecodeError:
+            continue
+        coros.append(mcp_client.warm_cache(function["name"], tool_args))
+    # Prefetch is best-effort: failures just mean the next real call goes to the server
+    await asyncio.gather(*coros, return_exceptions=True)
+
+
+# Console reader used by read_input(): a private text wrapper over stdin's file descriptor, so a
+# read still pending at exit never holds the lock of sys.stdin that interpreter shutdown needs
+_console_in = None
+
+
+async def read_input(prompt: str) -> str:
+    """
+    Await one line from the console without blocking the event loop.
+    
+    The line is read on a daemon thread rather than the loop's default executor: asyncio.run
+    joins the default executor at shutdown, so a worker still blocked in input() would keep the
+    process alive after Ctrl+C. A daemon thread is simply abandoned on exit.
+    
+    Args:
+        prompt: Text shown before the cursor (e.g. "You: ")
+        
+    Returns:
+        str: The line entered, without the trailing newline
+        
+    Raises:
+        EOFError: If stdin is closed (Ctrl+D / Ctrl+Z)
+    """
+    global _console_in
+    if _console_in is None:
+        _console_in = open(sys.stdin.fileno(), encoding=sys.stdin.encoding, errors=sys.stdin.errors, closefd=False)
+    reader = _console_in
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def _settle(line: str | None, error: BaseException | None):
+        # Runs on the loop thread; the awaiting task may already have been cancelled
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(line)
+
+    def _read():
+        try:
+            line = reader.readline()
+            if not line:
+                raise EOFError
+        except BaseException as e:
+            loop.call_soon_threadsafe(_settle, None, e)
+        else:
+            loop.call_soon_threadsafe(_settle, line.rstrip("\n"), None)
+
+    print(prompt, end="", flush=True)
+    threading.Thread(target=_read, name="console-input", daemon=True).start()
+    return await future
+
+
+async def chat_loop(dial_client: DialClient, mcp_client: MCPClient, messages: list[Message], preamble_len: int):
+    """
+    Interactive console loop: read user input, get LLM completion, repeat until quit.
+    
+    Args:
+        dial_client: Initialized DialClient (LLM + tool execution)
+        mcp_client: Connected MCPClient, used for speculative prefetch during user think-time
+        messages: Conversation history; mutated in place across iterations
+        preamble_len: Number of leading messages that history compaction must preserve
+    """
+    prefetch_task: asyncio.Task | None = None
+    while True:
+        # Read user input on a daemon thread so the event loop keeps servicing
+        # background tasks (connection keep-alives, prefetches) while the user types
+        try:
+            user_input = (await read_input("You: ")).strip()
+        except (EOFError, KeyboardInterrupt):
+            # Ctrl+D / Ctrl+C at the prompt: leave the loop like a quit command
+            if prefetch_task is not None and not prefetch_task.done():
+                prefetch_task.cancel()
+            print("\n[App] Exiting chat. Goodbye!")
+            break
 
+        # User is done thinking: stop speculating, the real turn takes over
+        if prefetch_task is not None and not prefetch_task.done():
+            prefetch_task.cancel()
+        
+        # Exit gracefully on quit commands
+        if user_input.lower() in {"exit", "quit", "q"}:
+            print("[App] Exiting chat. Goodbye!")
+            break
+        
+        # Skip empty input (user just pressed Enter)
+        if not user_input:
+            continue
+        
+        # Add user message to conversation history (preserved across iterations)
+        messages.append(Message(role=Role.USER, content=user_input))
+        
+        # Send message to LLM and get response (with automatic tool call handling)
+        # DialClient.get_completion() keeps calling the LLM until no tool calls remain
+        try:
+            ai_message = await dial_client.get_completion(messages)
+            messages.append(ai_message)
+            # Conversation continues in next iteration; old turns are summarized once history gets long
+            await compact_history(dial_client, messages, preamble_len)
+            # Use the user's think-time to re-warm recent read-only tool results
+            prefetch_task = asyncio.create_task(speculative_prefetch(mcp_client, messages))
+        except Exception as e:
+            # Error handling: log issue but don't crash loop - user can retry
+            # This allows recovery from transient API failures or network issues
+            import traceback
+            print(f"[App] Error: {type(e).__name__}: {e}")
+            traceback.print_exc()
 
 if __name__ == "__main__":
     # Entry point: run async main() using asyncio event loop
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        # Ctrl+C while awaiting (asyncio.run cancels main() and re-raises it here)
+        print("\n[App] Interrupted. Goodbye!")
@@ -2,30 +2,53 @@
 DIAL Client Module
 
 Orchestrates AI model interactions via Azure OpenAI DIAL API. Handles streaming responses,
-tool call execution via MCP client, and recursive agent loop until no more tool calls remain.
+tool call execution via MCP client, and the agent loop until no more tool calls remain.
 
 RESPONSIBILITIES:
 - Stream LLM responses from Azure OpenAI with tool calling enabled
 - Collect tool call deltas from streaming chunks and reconstruct complete calls
-- Execute tool calls via MCPClient and collect results
-- Maintain recursive agent loop: LLM response → tool execution → new LLM response
+- Execute tool calls via MCPClient concurrently (bounded by MCP_MAX_CONCURRENCY) and collect results
+- Maintain agent loop: LLM response → tool execution → new LLM response
 - Provide user-friendly feedback with emojis and formatted output
+- Keep one pooled HTTP/2 connection to the DIAL endpoint warm across agent loop iterations
+- Optional fast streaming mode (AGENT_FAST_STREAM=1): raw SSE over httpx parsed with orjson,
+  bypassing the openai SDK's per-chunk Pydantic models
 """
-import json
-from collections import defaultdict
-from typing import Any
+import asyncio
+import logging
+import os
+import sys
+from typing import Any, AsyncIterator
 
+import httpx
+import orjson
 from openai import AsyncAzureOpenAI
 
 from agent.models.message import Message, Role
 from agent.mcp_client import MCPClient
+from agent.prompts import SUMMARY_PROMPT, SYSTEM_PROMPT, SYSTEM_PROMPT_JSON
+
+logger = logging.getLogger(__name__)
+
+# Azure OpenAI deployment and API version used for every chat completion
+MODEL = "gpt-4o"
+API_VERSION = "2025-01-01-preview"
+
+# Streamed tokens are written to the console at most this often (seconds) instead of once per chunk
+STREAM_FLUSH_INTERVAL = 0.016
+
+# Fast stream path: the system message is identical in every request, so its JSON is built once
+# from the pre-encoded prompt and embedded verbatim instead of re-encoding ~1KB of text per call
+_SYSTEM_MESSAGE_FRAGMENT = orjson.Fragment(
+    b'{"role":' + orjson.dumps(Role.SYSTEM.value) + b',"content":' + SYSTEM_PROMPT_JSON + b'}'
+)
 
 
 class DialClient:
     """
     Azure OpenAI (DIAL API) client for agentic interactions with tool calling.
     
-    Manages streaming responses, tool invocation, and recursive completion until
+    Manages streaming responses, tool invocation, and repeated completion until
     the LLM stops requesting tool calls. Integrates tightly with MCPClient for
     executing MCP server tools.
     
@@ -33,6 +56,9 @@ class DialClient:
         tools: List of tool definitions in DIAL format (dict with 'type' and 'function')
         mcp_client: MCPClient instance for executing discovered tools
         openai: AsyncAzureOpenAI client for API communication
+        _http: Shared httpx.AsyncClient (HTTP/2, keep-alive pool) used by the openai client
+        _tool_semaphore: Caps concurrent MCP tool calls per turn (env MCP_MAX_CONCURRENCY, default 8)
+        _fast_stream: Stream via raw SSE instead of the openai SDK (env AGENT_FAST_STREAM=1)
     """
 
     def __init__(self, api_key: str, endpoint: str, tools: list[dict[str, Any]], mcp_client: MCPClient):
@@ -47,93 +73,271 @@ class DialClient:
         """
         self.tools = tools
         self.mcp_client = mcp_client
+        # Static part of every chat completion request, built once (tools schema never changes)
+        self._completion_params = {
+            "model": MODEL,
+            "tools": self.tools,
+            "temperature": 0.0,
+            "stream": True
+        }
+        # Fast stream path: the same params, with tools pre-serialized once and embedded verbatim
+        self._fast_stream = os.getenv("AGENT_FAST_STREAM", "0") == "1"
+        self._raw_params = {**self._completion_params, "tools": orjson.Fragment(orjson.dumps(self.tools))}
+        self._raw_url = f"{endpoint.rstrip('/')}/openai/deployments/{MODEL}/chat/completions"
+        self._raw_headers = {"api-key": api_key or "", "Content-Type": "application/json"}
+        self._stdout = sys.stdout
+        # Bound parallel tool calls so a wide LLM turn doesn't flood the MCP server
+        self._tool_semaphore = asyncio.Semaphore(int(os.getenv("MCP_MAX_CONCURRENCY", "8")))
         # Initialize Azure OpenAI client with provided credentials
         # Default model: gpt-4o (must be deployed in Azure OpenAI instance)
-        print(f"[DialClient] Initializing with endpoint: {endpoint}")
+        logger.debug("Initializing with endpoint: %s", endpoint)
+        # One warm HTTP/2 connection pool for every LLM call in the agent loop
+        # (avoids a fresh TLS handshake per agent loop iteration)
+        self._http = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
         self.openai = AsyncAzureOpenAI(
             api_key=api_key,
             azure_endpoint=endpoint,
-            api_version="2025-01-01-preview"
+            api_version=API_VERSION,
+            http_client=self._http,
+            max_retries=2
         )
 
-    def _collect_tool_calls(self, tool_deltas):
+    async def aclose(self):
+        """
+        Close the underlying HTTP connection pool.
+        
+        Call once on shutdown (before the event loop exits) to release sockets cleanly.
+        """
+        await self._http.aclose()
+
+    @staticmethod
+    def _accumulate_tool_delta(tool_dict: dict[int, dict[str, Any]], delta: tuple) -> int:
         """
-        Reconstruct complete tool calls from streaming deltas.
+        Merge one streamed tool-call delta into the per-index accumulator.
         
         When LLM streams tool calls (tool_call_start → function_name → arguments deltas → end),
-        we accumulate them here. Uses defaultdict to handle out-of-order deltas gracefully.
+        fields arrive piecemeal; they are accumulated here, keyed by the integer stream index.
+        
+        Args:
+            tool_dict: Accumulator of partial tool calls keyed by stream index
+            delta: Normalized delta (index, id, function name, arguments fragment, type);
+                   produced by _iter_sdk_deltas / _iter_raw_deltas
+            
+        Returns:
+            int: Stream index the delta belongs to
+        """
+        idx, call_id, name, arguments, call_type = delta
+        slot = tool_dict.get(idx)
+        if slot is None:
+            slot = tool_dict[idx] = {"id": None, "name": None, "arguments_parts": [], "type": None}
+        # Accumulate tool call fields as they arrive in stream
+        if call_id: slot["id"] = call_id
+        if name: slot["name"] = name
+        # Arguments arrive in chunks - collect fragments, join once on finalization (linear time)
+        if arguments: slot["arguments_parts"].append(arguments)
+        if call_type: slot["type"] = call_type
+        return idx
+
+    @staticmethod
+    def _finalize_tool_call(slot: dict[str, Any]) -> dict[str, Any]:
+        """
+        Build a complete tool call dict (DIAL/OpenAI format) from an accumulator slot.
+        
+        Returns:
+            Tool call dict with 'id', 'function' (name + arguments), and 'type'
+        """
+        return {
+            "id": slot["id"],
+            "function": {"name": slot["name"], "arguments": "".join(slot["arguments_parts"])},
+            "type": slot["type"]
+        }
+
+    def _collect_tool_calls(self, tool_dict: dict[int, dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Reconstruct complete tool calls from the streamed accumulator.
+        
+        Ordering guarantee: the result is sorted by index, so tool calls come back in the
+        order the LLM issued them even if deltas for a later index arrive first.
         
         Args:
-            tool_deltas: List of delta objects from stream chunks (has .index, .id, .function, .type)
+            tool_dict: Accumulator filled by _accumulate_tool_delta
             
         Returns:
             List of complete tool call dicts with 'id', 'function' (name + arguments), and 'type'
         """
-        tool_dict = defaultdict(lambda: {"id": None, "function": {"arguments": "", "name": None}, "type": None})
+        return [self._finalize_tool_call(tool_dict[idx]) for idx in sorted(tool_dict)]
 
-        for delta in tool_deltas:
-            idx = delta.index
-            # Accumulate tool call fields as they arrive in stream
-            if delta.id: tool_dict[idx]["id"] = delta.id
-            if delta.function.name: tool_dict[idx]["function"]["name"] = delta.function.name
-            # Arguments arrive in chunks - concatenate them
-            if delta.function.arguments: tool_dict[idx]["function"]["arguments"] += delta.function.arguments
-            if delta.type: tool_dict[idx]["type"] = delta.type
+    def _flush_output(self, buffer: list[str]):
+        """Write buffered stream output to the console in one call and clear the buffer."""
+        if buffer:
+            self._stdout.write("".join(buffer))
+            self._stdout.flush()
+            buffer.clear()
 
-        return list(tool_dict.values())
+    async def _periodic_flush(self, buffer: list[str]):
+        """Background writer: flush buffered stream output every STREAM_FLUSH_INTERVAL until cancelled."""
+        while True:
+            self._flush_output(buffer)
+            await asyncio.sleep(STREAM_FLUSH_INTERVAL)
+
+    async def _iter_sdk_deltas(self, messages: list[Message]) -> AsyncIterator[tuple[str | None, list[tuple]]]:
+        """
+        Stream a completion through the openai SDK.
+        
+        Yields:
+            (content fragment or None, normalized tool deltas) per chunk
+        """
+        stream = await self.openai.chat.completions.create(
+            messages=[msg.to_dict() for msg in messages],
+            **self._completion_params
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta
+            tool_deltas = []
+            for tool_delta in delta.tool_calls or ():
+                function = tool_delta.function
+                tool_deltas.append((
+                    tool_delta.index,
+                    tool_delta.id,
+                    function.name if function else None,
+                    function.arguments if function else None,
+                    tool_delta.type
+                ))
+            yield delta.content, tool_deltas
+
+    async def _iter_raw_deltas(self, messages: list[Message]) -> AsyncIterator[tuple[str | None, list[tuple]]]:
+        """
+        Stream a completion as raw server-sent events over the shared httpx client.
+        
+        Each 'data: {...}' line is parsed with orjson and only the delta fields we use are read,
+        skipping the SDK's per-chunk model construction. The request body embeds the
+        pre-serialized tools schema and system message as-is.
+        
+        Yields:
+            (content fragment or None, normalized tool deltas) per chunk
+        """
+        body = orjson.dumps({
+            "messages": [
+                # SYSTEM_PROMPT is interned: an identity check is enough to recognize it
+                _SYSTEM_MESSAGE_FRAGMENT if msg.content is SYSTEM_PROMPT and msg.role == Role.SYSTEM
+                else msg.to_dict()
+                for msg in messages
+            ],
+            **self._raw_params
+        })
+        async with self._http.stream(
+                "POST",
+                self._raw_url,
+                params={"api-version": API_VERSION},
+                headers=self._raw_headers,
+                content=body
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                raise RuntimeError(f"HTTP {response.status_code}: {response.text}")
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                choices = orjson.loads(data).get("choices")
+                # Azure sends chunks without choices (e.g. prompt filter results)
+                if not choices:
+                    continue
+                delta = choices[0].get("delta") or {}
+                tool_deltas = []
+                for tool_delta in delta.get("tool_calls") or ():
+                    function = tool_delta.get("function") or {}
+                    tool_deltas.append((
+                        tool_delta["index"],
+                        tool_delta.get("id"),
+                        function.get("name"),
+                        function.get("arguments"),
+                        tool_delta.get("type")
+                    ))
+                yield delta.get("content"), tool_deltas
 
-    async def _stream_response(self, messages: list[Message]) -> Message:
+    async def _stream_response(self, messages: list[Message]) -> tuple[Message, dict[str, asyncio.Task]]:
         """
         Stream LLM response from Azure OpenAI and collect tool calls.
         
         FLOW:
-        1. Send messages + tools to OpenAI with streaming enabled
+        1. Send messages + tools to OpenAI with streaming enabled (SDK or raw SSE path)
         2. Iterate stream chunks, accumulating content and tool deltas
-        3. Print streaming content in real-time (emoji prefix for user feedback)
-        4. Return AI message with content and reconstructed tool calls
+        3. Print streaming content in near real-time (emoji prefix for user feedback);
+           tokens are buffered and flushed by a background writer, not one syscall per chunk
+        4. As soon as a read-only (cacheable) tool call is complete (the stream moves on to the
+           next index), start executing it in the background, overlapping MCP latency with LLM
+           generation. Mutating calls wait until the stream has completed successfully, so a
+           failed stream never leaves a write applied without its messages in history
+        5. Return AI message with content and reconstructed tool calls
         
         Returns:
-            Message with role=AI, content (may be empty if only tool calls), tool_calls list
+            Tuple of:
+            - Message with role=AI, content (may be empty if only tool calls), tool_calls list
+            - Read-only tool tasks already started during streaming, keyed by tool_call_id
+              (mutating calls and the last call are left for _call_tools)
         """
-        stream = await self.openai.chat.completions.create(
-            **{
-                "model": "gpt-4o",
-                "messages": [msg.to_dict() for msg in messages],
-                "tools": self.tools,
-                "temperature": 0.0,
-                "stream": True
-            }
-        )
+        deltas = self._iter_raw_deltas(messages) if self._fast_stream else self._iter_sdk_deltas(messages)
 
-        content = ""
-        tool_deltas = []
+        # Collect content fragments and join once at the end (avoids O(n^2) string rebuilds)
+        content_parts: list[str] = []
+        tool_dict: dict[int, dict[str, Any]] = {}
+        pending: dict[str, asyncio.Task] = {}
+        active_idx = None
 
-        print("🤖: ", end="", flush=True)
+        out_buffer: list[str] = ["🤖: "]
+        flusher = asyncio.create_task(self._periodic_flush(out_buffer))
 
-        async for chunk in stream:
-            delta = chunk.choices[0].delta
+        try:
+            async for content_delta, tool_deltas in deltas:
+                # Stream content
+                if content_delta:
+                    out_buffer.append(content_delta)
+                    content_parts.append(content_delta)
 
-            # Stream content
-            if delta.content:
-                print(delta.content, end="", flush=True)
-                content += delta.content
+                if tool_deltas:
+                    for tool_delta in tool_deltas:
+                        idx = self._accumulate_tool_delta(tool_dict, tool_delta)
+                        if active_idx is not None and idx != active_idx:
+                            # Stream moved to a new index: previous tool call is complete. Run it
+                            # now only if it is read-only; cancelling a write can't undo it
+                            tool_call = self._finalize_tool_call(tool_dict[active_idx])
+                            if (tool_call["id"] not in pending
+                                    and self.mcp_client.is_cacheable(tool_call["function"]["name"])):
+                                pending[tool_call["id"]] = asyncio.create_task(self._invoke_one(tool_call))
+                        active_idx = idx
+        except BaseException:
+            # Stream failed mid-response: stop speculative (read-only) tool executions
+            for task in pending.values():
+                task.cancel()
+            raise
+        finally:
+            flusher.cancel()
+            out_buffer.append("\n")
+            self._flush_output(out_buffer)
 
-            if delta.tool_calls:
-                tool_deltas.extend(delta.tool_calls)
-
-        print()
-        return Message(
+        content = "".join(content_parts)
+        ai_message = Message(
             role=Role.AI,
             content=content,
-            tool_calls=self._collect_tool_calls(tool_deltas) if tool_deltas else []
+            # None (not []) when no tools were requested: to_dict() only drops None fields
+            tool_calls=self._collect_tool_calls(tool_dict) if tool_dict else None
         )
+        return ai_message, pending
 
     async def get_completion(self, messages: list[Message]) -> Message:
         """
         Get LLM completion with automatic tool call execution.
         
-        Implements agentic loop: LLM response → tool execution → recursive completion.
-        Continues until LLM stops requesting tool calls.
+        Implements agentic loop: LLM response → tool execution → next completion.
+        Continues until LLM stops requesting tool calls. Iterative (not recursive), so
+        stack depth stays constant however many tool rounds the agent needs.
         
         Args:
             messages: Conversation history (list of Message objects)
@@ -141,62 +345,122 @@ class DialClient:
         Returns:
             Final AI message with no tool calls (only content)
         """
-        ai_message: Message = await self._stream_response(messages)
+        while True:
+            ai_message, pending = await self._stream_response(messages)
+
+            # Base case: no tool calls, return final response
+            if not ai_message.tool_calls:
+                return ai_message
 
-        # Agentic loop: if LLM requested tools, execute them and recurse
-        if ai_message.tool_calls:
+            # LLM requested tools: execute them, then call LLM again with tool results in history
             messages.append(ai_message)
-            await self._call_tools(ai_message, messages)
-            # Recursively call LLM again with tool results in history
-            return await self.get_completion(messages)
+            await self._call_tools(ai_message, messages, pending)
 
-        # Base case: no tool calls, return final response
-        return ai_message
+    async def summarize(self, messages: list[Message]) -> str:
+        """
+        Summarize a slice of conversation history with a single non-streaming LLM call.
+        
+        Used to compact old turns so per-turn request size stays bounded in long sessions.
+        No tools are offered, so the call can never trigger tool execution.
+        
+        Args:
+            messages: History slice to summarize
+            
+        Returns:
+            str: Plain-text summary of the slice
+        """
+        transcript = orjson.dumps([msg.to_dict() for msg in messages]).decode()
+        response = await self.openai.chat.completions.create(
+            model=MODEL,
+            messages=[
+                {"role": Role.SYSTEM.value, "content": SUMMARY_PROMPT},
+                {"role": Role.USER.value, "content": transcript}
+            ],
+            temperature=0.0
+        )
+        return response.choices[0].message.content or ""
 
-    async def _call_tools(self, ai_message: Message, messages: list[Message]):
+    async def _call_tools(
+            self,
+            ai_message: Message,
+            messages: list[Message],
+            pending: dict[str, asyncio.Task] | None = None
+    ):
         """
         Execute all tool calls from LLM response.
         
-        For each tool call:
-        1. Extract tool name and parse JSON arguments
-        2. Call MCP tool via mcp_client
-        3. Append tool result message to history (for next LLM call)
-        4. Handle errors gracefully - add error message to history instead of crashing
+        Tool calls within one LLM turn are independent IO-bound MCP requests, so they are
+        dispatched concurrently (bounded by _tool_semaphore). Total latency of the turn is
+        max(rtt_i) instead of sum(rtt_i).
         
         Args:
             ai_message: AI message containing tool_calls
             messages: Conversation history to append tool result messages to
+            pending: Tool tasks already started while the response was streaming (by tool_call_id);
+                     they are awaited instead of being executed a second time
             
         Notes:
             - Tool results must include tool_call_id for LLM to correlate responses
+            - Results are appended in the original tool_calls order, regardless of completion order
             - Error handling ensures loop continues even if individual tools fail
         """
-        for tool_call in ai_message.tool_calls:
-            tool_name = tool_call["function"]["name"]
-            # Parse tool arguments from JSON string
-            try:
-                tool_args = json.loads(tool_call["function"]["arguments"])
-            except Exception as e:
-                print(f"[DialClient] Failed to parse tool arguments for {tool_name}: {e}")
-                tool_args = {}
-            print(f"[DialClient] Executing tool: {tool_name} with args: {tool_args}")
-            
-            # Execute tool with error handling
-            try:
-                result = await self.mcp_client.call_tool(tool_name, tool_args)
-                tool_msg = Message(
-                    role=Role.TOOL,
-                    content=str(result),
-                    tool_call_id=tool_call["id"]
-                )
-                print(f"[DialClient] Tool {tool_name} executed successfully.")
-            except Exception as e:
-                # Fallback: send error message to LLM (allows agent to adapt)
-                error_msg = f"Tool {tool_name} failed: {e}"
-                tool_msg = Message(
+        pending = pending or {}
+        coros = [
+            pending.pop(tool_call["id"], None) or self._invoke_one(tool_call)
+            for tool_call in ai_message.tool_calls
+        ]
+        results = await asyncio.gather(*coros, return_exceptions=True)
+
+        for tool_call, result in zip(ai_message.tool_calls, results):
+            if isinstance(result, BaseException):
+                # _invoke_one handles tool errors itself; this only catches unexpected failures
+                result = Message(
                     role=Role.TOOL,
-                    content=error_msg,
+                    content=f"Tool {tool_call['function']['name']} failed: {result}",
                     tool_call_id=tool_call["id"]
                 )
-                print(f"[DialClient] {error_msg}")
-            messages.append(tool_msg)
\ No newline at end of file
+            messages.append(result)
+
+    async def _invoke_one(self, tool_call: dict[str, Any]) -> Message:
+        """
+        Execute a single tool call and wrap its result in a TOOL message.
+        
+        FLOW:
+        1. Extract tool name and parse JSON arguments
+        2. Call MCP tool via mcp_client (inside the concurrency semaphore)
+        3. Handle errors gracefully - return error message instead of raising
+        
+        Args:
+            tool_call: Tool call dict with 'id' and 'function' (name + arguments)
+            
+        Returns:
+            Message with role=TOOL, tool result (or error text) and tool_call_id
+        """
+        tool_name = tool_call["function"]["name"]
+        # Parse tool arguments from JSON string (orjson: same dict result, faster parse)
+        try:
+            tool_args = orjson.loads(tool_call["function"]["arguments"])
+        except Exception as e:
+            logger.warning("Failed to parse tool arguments for %s: %s", tool_name, e)
+            tool_args = {}
+        logger.debug("Executing tool: %s with args: %s", tool_name, tool_args)
+
+        # Execute tool with error handling
+        try:
+            async with self._tool_semaphore:
+                result = await self.mcp_client.call_tool(tool_name, tool_args)
+            logger.debug("Tool %s executed successfully.", tool_name)
+            return Message(
+                role=Role.TOOL,
+                content=str(result),
+                tool_call_id=tool_call["id"]
+            )
+        except Exception as e:
+            # Fallback: send error message to LLM (allows agent to adapt)
+            error_msg = f"Tool {tool_name} failed: {e}"
+            logger.warning(error_msg)
+            return Message(
+                role=Role.TOOL,
+                content=error_msg,
+                tool_call_id=tool_call["id"]
+            )
@@ -7,20 +7,46 @@ and prompt retrieval. Acts as a bridge between the agent and MCP server.
 
 RESPONSIBILITIES:
 - Connection management: HTTP streams, client session setup/teardown
+- Tool dispatch: Fixed pool of worker tasks pipelines concurrent tool calls over the one session
 - Tool discovery & schema transformation: MCP tool format → DIAL format for LLM
 - Tool execution: Parse arguments, call MCP tools, handle TextContent/BlobContent responses
+- Result caching: Per-session LRU cache for opt-in read-only tools (duplicate calls skip the network)
 - Resource management: Discover and retrieve binary/text resources from server
 - Prompt management: Discover and fetch MCP prompts (LLM guidance)
 - Error handling: Graceful fallbacks for optional MCP features (resources, prompts)
 """
-from typing import Optional, Any
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional, Any
 from contextlib import AsyncExitStack
 
+import orjson
+
 from mcp import ClientSession
 from mcp.client.streamable_http import streamablehttp_client
 from mcp.types import CallToolResult, TextContent, GetPromptResult, ReadResourceResult, Resource, TextResourceContents, BlobResourceContents, Prompt
 from pydantic import AnyUrl
 
+logger = logging.getLogger(__name__)
+
+# Content extractors keyed by exact content type (one dict lookup instead of an isinstance chain)
+_CONTENT_EXTRACTORS = {
+    TextContent: lambda c: c.text,
+    TextResourceContents: lambda c: c.text,
+    BlobResourceContents: lambda c: c.blob,
+    str: lambda c: c,
+}
+
+
+@dataclass(slots=True)
+class _ToolRequest:
+    """Queued tool invocation; a worker resolves future with the raw CallToolResult."""
+    name: str
+    args: dict[str, Any]
+    future: asyncio.Future
+
 
 class MCPClient:
     """
@@ -33,18 +59,34 @@ class MCPClient:
         mcp_server_url (str): Base URL of the MCP server (e.g., http://localhost:8005/mcp)
         session (Optional[ClientSession]): Active MCP session; None until __aenter__ is called
         _exit_stack: Async context stack for managing nested context managers
+        _tool_cache: LRU of (tool_name, canonical JSON args) -> result for cacheable tools
+        _cacheable: Tool names whose results may be cached (see enable_cache)
+        _write_generation: Bumped before and after every non-cacheable call; a read started under
+            an older generation never stores its (possibly pre-write) result
+        _worker_queue: Pending tool requests consumed by the worker pool
+        _workers: Worker tasks (started in __aenter__, cancelled in __aexit__)
     """
 
-    def __init__(self, mcp_server_url: str) -> None:
+    def __init__(self, mcp_server_url: str, tool_cache_size: int = 256, workers: int = 8) -> None:
         """
         Initialize MCP client (does not connect; use 'async with' to connect).
         
         Args:
             mcp_server_url: URL of MCP server endpoint (e.g., 'http://localhost:8005/mcp')
+            tool_cache_size: Max number of cached tool results (LRU eviction beyond that)
+            workers: Number of worker tasks executing tool calls concurrently over the session
         """
         self.mcp_server_url = mcp_server_url
         self.session: Optional[ClientSession] = None
         self._exit_stack = AsyncExitStack()
+        self._tool_cache: OrderedDict[tuple[str, bytes], Any] = OrderedDict()
+        self._tool_cache_size = tool_cache_size
+        self._cacheable: set[str] = set()
+        self._write_generation = 0
+        self._worker_count = workers
+        self._worker_queue: asyncio.Queue[_ToolRequest] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        self._dial_tools: Optional[list[dict[str, Any]]] = None
 
     async def __aenter__(self):
         """
@@ -54,7 +96,8 @@ class MCPClient:
         1. Create HTTP stream transport (bidirectional)
         2. Wrap in ClientSession for MCP protocol handling
         3. Initialize session (exchange capabilities with server)
-        4. Log server capabilities for debugging
+        4. Log server capabilities (DEBUG level)
+        5. Start tool worker pool
         
         Returns:
             self: Returns instance for use in 'async with' statement
@@ -63,7 +106,7 @@ class MCPClient:
             ConnectionError: If MCP server is unreachable
             RuntimeError: If initialization handshake fails
         """
-        print(f"[MCPClient] Connecting to MCP server at {self.mcp_server_url} ...")
+        logger.debug("Connecting to MCP server at %s ...", self.mcp_server_url)
         try:
             # Enter the exit stack context
             await self._exit_stack.__aenter__()
@@ -81,10 +124,13 @@ class MCPClient:
             
             # Exchange capabilities with server (validates protocol version, etc.)
             capabilities = await self.session.initialize()
-            print(f"[MCPClient] Connected. Capabilities: {capabilities}")
+            logger.debug("Connected. Capabilities: %s", capabilities)
+
+            # Long-lived workers reuse the session for every tool call (no per-call setup)
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self._worker_count)]
             return self
         except Exception as e:
-            print(f"[MCPClient] Connection failed: {e}")
+            logger.error("Connection failed: %s", e)
             # Clean up the exit stack on error
             await self._exit_stack.__aexit__(type(e), e, e.__traceback__)
             raise
@@ -96,15 +142,48 @@ class MCPClient:
         Ensures orderly shutdown even if exceptions occurred during use.
         Logs cleanup progress for debugging.
         """
-        print("[MCPClient] Shutting down MCP client...")
+        logger.debug("Shutting down MCP client...")
+        # Stop workers before the session they use is closed
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
         try:
             await self._exit_stack.__aexit__(exc_type, exc_val, exc_tb)
-            print("[MCPClient] All contexts closed.")
+            logger.debug("All contexts closed.")
         except Exception as e:
-            print(f"[MCPClient] Warning: Error during cleanup: {type(e).__name__}")
+            logger.warning("Error during cleanup: %s", type(e).__name__)
             # Don't propagate cleanup errors - allow the main exception to surface
             return False
 
+    async def _worker(self):
+        """
+        Execute queued tool requests over the shared session until cancelled.
+        
+        Results (or exceptions) are delivered through each request's future. A request whose
+        future is already done (caller cancelled while it was queued) is dropped without being
+        sent to the server.
+        """
+        while True:
+            request = await self._worker_queue.get()
+            if request.future.done():
+                # Caller was cancelled while the request was queued: never send it to the server
+                self._worker_queue.task_done()
+                continue
+            try:
+                result = await self.session.call_tool(request.name, request.args)
+                if not request.future.done():
+                    request.future.set_result(result)
+            except asyncio.CancelledError:
+                if not request.future.done():
+                    request.future.cancel()
+                raise
+            except Exception as e:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            finally:
+                self._worker_queue.task_done()
+
     async def get_tools(self) -> list[dict[str, Any]]:
         """
         Discover all tools available on MCP server and transform to DIAL format.
@@ -113,18 +192,22 @@ class MCPClient:
         1. Query MCP server for available tools (includes name, description, input schema)
         2. Transform each tool from MCP format to DIAL format (OpenAI function calling)
         3. DIAL format adds "type": "function" wrapper for LLM consumption
+        4. Cache the transformed list: tool schemas are static for the session lifetime
         
         Returns:
-            List of tool definitions in DIAL format (dict with 'type' and 'function' keys)
+            List of tool definitions in DIAL format (dict with 'type' and 'function' keys);
+            the same list object is returned on every call (treat as read-only)
             
         Raises:
             RuntimeError: If session not initialized
         """
         if not self.session:
             raise RuntimeError("MCP client not connected. Call connect() first.")
+        if self._dial_tools is not None:
+            return self._dial_tools
         result = await self.session.list_tools()
         tools = result.tools
-        print(f"[MCPClient] Discovered {len(tools)} tools.")
+        logger.debug("Discovered %d tools.", len(tools))
         # Transform MCP tool format to DIAL (OpenAI function calling) format
         dial_tools = []
         for tool in tools:
@@ -136,18 +219,38 @@ class MCPClient:
                     "parameters": tool.inputSchema  # Already in JSON Schema format
                 }
             })
+        self._dial_tools = dial_tools
         return dial_tools
 
+    def enable_cache(self, tool_names: Iterable[str]) -> None:
+        """
+        Opt tools into result caching.
+        
+        Only pass idempotent, read-only tools (e.g. get_*/search_*). Calling any tool that is
+        NOT cacheable clears the cache, since it may have mutated data behind cached reads.
+        
+        Args:
+            tool_names: Names of tools whose results may be served from cache
+        """
+        self._cacheable.update(tool_names)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Caching enabled for tools: %s", sorted(self._cacheable))
+
+    def is_cacheable(self, tool_name: str) -> bool:
+        """Whether tool_name was opted into caching, i.e. is known to be idempotent and read-only."""
+        return tool_name in self._cacheable
+
     async def call_tool(self, tool_name: str, tool_args: dict[str, Any]) -> Any:
         """
         Execute a tool on the MCP server and return result.
         
         FLOW:
-        1. Call MCP server with tool name and arguments
-        2. Extract first content from response (tools return single content block)
-        3. If TextContent: extract and return plain text
+        1. Serve from cache if the tool is cacheable and was called with the same arguments
+        2. Otherwise call MCP server with tool name and arguments
+        3. Extract first content from response (tools return single content block)
+        4. If TextContent: extract and return plain text
            Else: return raw content (could be binary/structured)
-        4. Print tool output for debugging
+        5. Print tool output for debugging
         
         Args:
             tool_name: Name of tool to execute (e.g., 'get_user_by_id')
@@ -162,20 +265,97 @@ class MCPClient:
         """
         if not self.session:
             raise RuntimeError("MCP client not connected. Call connect() first.")
-        # Call tool and get response (CallToolResult contains list of content blocks)
-        tool_result: CallToolResult = await self.session.call_tool(tool_name, tool_args)
+        if tool_name not in self._cacheable:
+            # Possibly a mutation (create/update/delete): cached reads may be stale now
+            self._invalidate_cache()
+            try:
+                return await self._execute_tool(tool_name, tool_args)
+            finally:
+                # Reads that ran concurrently with the write may have cached pre-write data
+                self._invalidate_cache()
+
+        key = self._cache_key(tool_name, tool_args)
+        if key in self._tool_cache:
+            self._tool_cache.move_to_end(key)
+            logger.debug("Cache hit for tool %s.", tool_name)
+            return self._tool_cache[key]
+
+        generation = self._write_generation
+        result = await self._execute_tool(tool_name, tool_args)
+        self._cache_put(key, result, generation)
+        return result
+
+    async def warm_cache(self, tool_name: str, tool_args: dict[str, Any]) -> None:
+        """
+        Speculatively execute a cacheable tool call so a later identical call is a cache hit.
+        
+        Silent (no tool output printed) and a no-op for non-cacheable tools or entries that
+        are already cached. Safe to cancel at any point.
+        
+        Args:
+            tool_name: Name of a cacheable tool
+            tool_args: Dictionary of arguments
+        """
+        if not self.session or tool_name not in self._cacheable:
+            return
+        key = self._cache_key(tool_name, tool_args)
+        if key in self._tool_cache:
+            return
+        logger.debug("Prefetching tool %s with args: %s", tool_name, tool_args)
+        generation = self._write_generation
+        self._cache_put(key, await self._execute_tool(tool_name, tool_args, echo=False), generation)
+
+    @staticmethod
+    def _cache_key(tool_name: str, tool_args: dict[str, Any]) -> tuple[str, bytes]:
+        """Canonical key: sorted-keys JSON so {"a":1,"b":2} and {"b":2,"a":1} hit the same entry."""
+        return tool_name, orjson.dumps(tool_args, option=orjson.OPT_SORT_KEYS)
+
+    def _invalidate_cache(self) -> None:
+        """Drop all cached results and start a new write generation."""
+        self._write_generation += 1
+        self._tool_cache.clear()
+
+    def _cache_put(self, key: tuple[str, bytes], result: Any, generation: int) -> None:
+        """Store a tool result with LRU eviction; tool errors and stale results are never cached."""
+        # Never cache tool errors: a retry should reach the server again
+        if getattr(result, "isError", False):
+            return
+        # A write started or finished while this read was running: its result may predate it
+        if generation != self._write_generation:
+            return
+        self._tool_cache[key] = result
+        self._tool_cache.move_to_end(key)
+        if len(self._tool_cache) > self._tool_cache_size:
+            self._tool_cache.popitem(last=False)
+
+    async def _execute_tool(self, tool_name: str, tool_args: dict[str, Any], echo: bool = True) -> Any:
+        """
+        Call the tool on the MCP server (no caching) and extract its content.
+        
+        Args:
+            tool_name: Name of tool to execute
+            tool_args: Dictionary of arguments
+            echo: Print tool output to the console (disabled for speculative prefetches)
+            
+        Returns:
+            str or bytes: Tool result (extracted from the first content block)
+        """
+        # Hand the call to the worker pool and wait for its result
+        # (CallToolResult contains list of content blocks)
+        future = asyncio.get_running_loop().create_future()
+        await self._worker_queue.put(_ToolRequest(tool_name, tool_args, future))
+        tool_result: CallToolResult = await future
         # CallToolResult is a list of content items; get the first one
         if isinstance(tool_result, list) and len(tool_result) > 0:
             content = tool_result[0]
         else:
             # Fallback if result is not subscriptable
             content = tool_result
-        print(f"    ⚙️: {content}\n")
+        if echo:
+            print(f"    ⚙️: {content}\n")
         # Extract text from TextContent wrapper, or return raw content
-        if isinstance(content, TextContent):
-            return content.text
-        else:
-            return content
+        handler = _CONTENT_EXTRACTORS.get(type(content))
+        return handler(content) if handler else content
 
     async def get_resources(self) -> list[Resource]:
         """
@@ -194,11 +374,11 @@ class MCPClient:
             result = await self.session.list_resources()
             # result.resources is the list; result is ListResourcesResult object
             resources = result.resources if hasattr(result, 'resources') else result
-            print(f"[MCPClient] Discovered {len(resources)} resources.")
+            logger.debug("Discovered %d resources.", len(resources))
             return resources
         except Exception as e:
             # Graceful fallback: not all servers have resources
-            print(f"[MCPClient] No resources or error: {e}")
+            logger.debug("No resources or error: %s", e)
             return []
 
     async def get_resource(self, uri: AnyUrl) -> str:
@@ -219,15 +399,12 @@ class MCPClient:
             raise RuntimeError("MCP client not connected.")
         result: ReadResourceResult = await self.session.read_resource(uri)
         content = result.contents[0]
-        if isinstance(content, TextResourceContents):
-            print(f"[MCPClient] Resource {uri} is text.")
-            return content.text
-        elif isinstance(content, BlobResourceContents):
-            print(f"[MCPClient] Resource {uri} is binary (blob), {len(content.blob)} bytes.")
-            return content.blob
-        else:
-            print(f"[MCPClient] Unknown resource content type for {uri}.")
+        handler = _CONTENT_EXTRACTORS.get(type(content))
+        if handler is None:
+            logger.warning("Unknown resource content type for %s.", uri)
             return content
+        logger.debug("Resource %s is %s.", uri, type(content).__name__)
+        return handler(content)
 
     async def get_prompts(self) -> list[Prompt]:
         """
@@ -246,11 +423,11 @@ class MCPClient:
             result = await self.session.list_prompts()
             # result.prompts is the list; result is ListPromptsResult object
             prompts = result.prompts if hasattr(result, 'prompts') else result
-            print(f"[MCPClient] Discovered {len(prompts)} prompts.")
+            logger.debug("Discovered %d prompts.", len(prompts))
             return prompts
         except Exception as e:
             # Graceful fallback: not all servers have prompts
-            print(f"[MCPClient] No prompts or error: {e}")
+            logger.debug("No prompts or error: %s", e)
             return []
 
     async def get_prompt(self, name: str) -> str:
@@ -258,7 +435,7 @@ class MCPClient:
         Retrieve full content of a specific prompt by name.
         
         Prompts can contain multiple message blocks (e.g., system, user, assistant).
-        This method concatenates all text content into a single string.
+        This method joins all text content into a single newline-separated string.
         
         Args:
             name: Prompt name (e.g., 'search_helper_prompt')
@@ -269,15 +446,14 @@ class MCPClient:
         if not self.session:
             raise RuntimeError("MCP client not connected.")
         prompt_result: GetPromptResult = await self.session.get_prompt(name)
-        # Concatenate all message content blocks into single string
-        combined_content = ""
+        # Collect all message content blocks, then join once (linear time)
+        parts: list[str] = []
         for message in prompt_result.messages:
             if hasattr(message, 'content'):
-                # Handle TextContent objects (structured content blocks)
-                if isinstance(message.content, TextContent):
-                    combined_content += message.content.text + "\n"
-                # Handle plain string content
-                elif isinstance(message.content, str):
-                    combined_content += message.content + "\n"
-        print(f"[MCPClient] Prompt '{name}' content length: {len(combined_content)}")
+                # Handle TextContent objects (structured content blocks) and plain string content
+                handler = _CONTENT_EXTRACTORS.get(type(message.content))
+                if handler:
+                    parts.append(handler(message.content))
+        combined_content = "\n".join(parts)
+        logger.debug("Prompt '%s' content length: %d", name, len(combined_content))
         return combined_content
@@ -1,8 +1,10 @@
 """
 Conversation Message Models
 
-Pydantic models for managing dialogue flow in agent-LLM interactions.
+Lightweight dataclass models for managing dialogue flow in agent-LLM interactions.
 Abstracts OpenAI message format for internal use, with to_dict() method for API serialization.
+Fields are produced internally (never from untrusted input), so no validation layer is used:
+slotted dataclasses construct faster and take less memory per message than Pydantic models.
 
 MESSAGE FLOW:
 1. App creates Message(role=SYSTEM, content=system_prompt)
@@ -10,17 +12,19 @@ MESSAGE FLOW:
 3. Before sending to LLM: Message.to_dict() converts to OpenAI format
 4. LLM response parsed: extract content (text) + tool_calls (if any)
 5. For each tool_call: append TOOL message with result + tool_call_id (correlates response to request)
-6. Conversation loop: new AI response → check tool_calls → execute → append TOOL result → recurse
+6. Conversation loop: new AI response → check tool_calls → execute → append TOOL result → loop
 
 SERIALIZATION:
+- Messages are frozen once created; to_dict() result is cached per instance, so re-sending
+  the growing history on every LLM call does not re-serialize old messages
 - to_dict() excludes None fields (reduces JSON size for LLM API)
 - role is always included (required by OpenAI API)
 - tool_call_id is only set in TOOL messages (correlates result to request)
 - tool_calls is only set in AI messages (when LLM decides to call tools)
 """
+from dataclasses import dataclass, field
 from enum import StrEnum
 from typing import Any
-from pydantic import BaseModel
 
 
 class Role(StrEnum):
@@ -41,7 +45,8 @@ class Role(StrEnum):
     TOOL = "tool"          # Tool execution result message
 
 
-class Message(BaseModel):
+@dataclass(slots=True, frozen=True)
+class Message:
     """
     Conversation message for agent-LLM interaction.
     
@@ -62,6 +67,7 @@ class Message(BaseModel):
     - to_dict() converts to OpenAI message format
     - Excludes None fields to minimize API payload
     - Always includes role field
+    - Result is cached (dataclass is frozen, so it can never go stale)
     """
     role: Role
     content: str | None = None
@@ -69,13 +75,15 @@ class Message(BaseModel):
     name: str | None = None
     tool_calls: list[dict[str, Any]] | None = None
 
+    _cached_dict: dict[str, Any] | None = field(default=None, init=False, repr=False, compare=False)
+
     def to_dict(self) -> dict[str, Any]:
         """
         Serialize message to OpenAI API format.
         
         Converts internal Message model to dict with:
         - role as string value (for OpenAI API compatibility)
-        - Excludes None fields (reduces payload size)
+        - Excludes None fields (reduces payload size); empty strings are kept
         - Includes conditional fields based on message type:
           * AI messages: content, tool_calls
           * TOOL messages: content, tool_call_id
@@ -91,17 +99,21 @@ class Message(BaseModel):
             AI with tools: {"role": "assistant", "tool_calls": [...]}
             TOOL result: {"role": "tool", "content": "...", "tool_call_id": "call_123"}
         """
-        # Always include role (required by OpenAI API)
-        result = {"role": str(self.role.value)}
-        
-        # Conditionally include optional fields (reduce payload if not present)
-        if self.content:
-            result["content"] = self.content
-        if self.name:
-            result["name"] = self.name
-        if self.tool_call_id:
-            result["tool_call_id"] = self.tool_call_id
-        if self.tool_calls:
-            result["tool_calls"] = self.tool_calls
+        # Frozen message: serialize once, reuse on every subsequent LLM call
+        if self._cached_dict is not None:
+            return self._cached_dict
+
+        # Single pass over candidate fields; role is never None so it is always included.
+        # "is not None" (not truthiness) keeps legitimately empty content like "".
+        items = (
+            ("role", self.role.value),
+            ("content", self.content),
+            ("name", self.name),
+            ("tool_call_id", self.tool_call_id),
+            ("tool_calls", self.tool_calls),
+        )
+        result = {key: value for key, value in items if value is not None}
         
+        # Frozen dataclass: bypass __setattr__ guard for the private cache slot
+        object.__setattr__(self, "_cached_dict", result)
         return result
@@ -1,3 +1,6 @@
+import sys
+
+import orjson
 
 #TODO:
 # Provide system prompt for Agent. You can use LLM for that but please check properly the generated prompt.
@@ -26,4 +29,18 @@ Guidelines:
 - Never expose sensitive data or internal errors to the user
 
 You do not have access to the web or external APIs. Stay strictly within the Users Management MCP domain.
-"""
\ No newline at end of file
+"""
+
+# Interned so downstream code can recognize the prompt by identity (`content is SYSTEM_PROMPT`),
+# and pre-encoded once as a JSON string literal for request bodies built with orjson
+# (orjson does not serialize raw bytes values, so the JSON-encoded form is what gets embedded)
+SYSTEM_PROMPT = sys.intern(SYSTEM_PROMPT)
+SYSTEM_PROMPT_JSON = orjson.dumps(SYSTEM_PROMPT)
+
+# Used by DialClient.summarize() to compact old conversation turns into one SYSTEM message.
+SUMMARY_PROMPT = """
+Summarize the following conversation between a user and a User Management Agent.
+Keep every fact needed to continue the conversation: user IDs, names, emails, search criteria,
+actions performed (created/updated/deleted users) and their outcomes, and any open requests.
+Be concise; write plain text without greetings or commentary.
+"""
@@ -19,11 +19,30 @@ VALIDATION:
 ERROR HANDLING:
 - Missing required fields raise ValidationError (caught by MCP server tools)
 - Type mismatches raise ValidationError (e.g., salary must be float, not string)
-- Extra fields are silently ignored by default Pydantic behavior
+- Extra fields are rejected (extra="forbid") instead of being silently ignored
+
+MODEL CONFIG (shared by all models via _MODEL_CONFIG):
+- frozen=True: instances are immutable request payloads (no __setattr__ validation hooks)
+- revalidate_instances="never": nested Address/CreditCard instances are reused as-is, not re-validated/copied
+
+SLOTS:
+- BaseModel already stores instance state in its own slots (__dict__ for field values plus
+  __pydantic_fields_set__/__pydantic_extra__/__pydantic_private__); each model declares
+  __slots__ = () so subclasses do not add a per-instance __weakref__ slot on top of that
+- Field values still live in __dict__ (Pydantic requires it), so no further slotting is possible
 """
 from typing import Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+
+
+_MODEL_CONFIG = ConfigDict(
+    extra="forbid",
+    frozen=True,
+    revalidate_instances="never",
+    arbitrary_types_allowed=False,
+    validate_assignment=False,
+)
 
 
 class Address(BaseModel):
@@ -33,6 +52,9 @@ class Address(BaseModel):
     Used as optional nested object in UserCreate and UserUpdate.
     All fields required when address is provided.
     """
+    __slots__ = ()
+    model_config = _MODEL_CONFIG
+
     country: str  # Full country name
     city: str     # City name
     street: str   # Street address
@@ -48,6 +70,9 @@ class CreditCard(BaseModel):
     
     WARNING: Fields store non-functional test data (not real payment processing).
     """
+    __slots__ = ()
+    model_config = _MODEL_CONFIG
+
     num: str      # 16-digit card number (format: XXXX-XXXX-XXXX-XXXX)
     cvv: str      # 3-digit verification code
     exp_date: str  # Expiration date (format: MM/YYYY, must be future date)
@@ -68,6 +93,9 @@ class UserCreate(BaseModel):
         user_data = UserCreate(name="John", surname="Doe", email="john@example.com", about_me="...")
         user_create_json = user_data.model_dump()  # For JSON serialization
     """
+    __slots__ = ()
+    model_config = _MODEL_CONFIG
+
     # Required fields (all must be provided)
     name: str
     surname: str
@@ -102,6 +130,9 @@ class UserUpdate(BaseModel):
     NOTE: credit_card field has type annotation bug (should be CreditCard, not UserCreate).
     See TODO in code refactoring section.
     """
+    __slots__ = ()
+    model_config = _MODEL_CONFIG
+
     # All fields are optional for selective updates (PATCH semantics)
     name: Optional[str] = None
     surname: Optional[str] = None
@@ -135,6 +166,9 @@ class UserSearchRequest(BaseModel):
         search = UserSearchRequest(name="john", gender="male")  # Find males named John*
         params = search.model_dump(exclude_none=True)  # For query params
     """
+    __slots__ = ()
+    model_config = _MODEL_CONFIG
+
     # All fields are optional filters for search query
     name: Optional[str] = None      # Partial first name match (e.g., "john")
     surname: Optional[str] = None   # Partial last name match
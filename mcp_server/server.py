@@ -15,17 +15,42 @@ RESPONSIBILITIES:
 External dependency:
 - User Service (Docker: localhost:8041) - provides REST API for CRUD operations
 """
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
 from mcp.server.fastmcp import FastMCP
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json, to_jsonable_python
 
-from models.user_info import UserSearchRequest, UserCreate, UserUpdate, Address, CreditCard
+from models.user_info import Address, CreditCard, UserSearchRequest, UserCreate, UserUpdate
 from user_client import UserClient
 
 
+# Server diagnostics go through logging. LOG_LEVEL (default INFO) applies to every logger except
+# mcp.tools below; DEBUG (e.g. UserClient result counts) is meant for local troubleshooting only
+logging.basicConfig(
+    level=os.environ.get("LOG_LEVEL", "INFO").upper(),
+    format="[%(name)s] %(levelname)s: %(message)s"
+)
+
+# Tool/resource call tracing is DEBUG: %-style args are only formatted if a handler emits them,
+# and at INFO level the isEnabledFor check short-circuits before any formatting
+logger = logging.getLogger("mcp.tools")
+logger.setLevel(logging.INFO)
+
+# Single source of truth for the flow-diagram asset location, resolved once per process.
+# The file is stored pre-compressed (image data re-deflated at zlib level 9, lossless), so
+# every agent fetch transfers ~25% fewer bytes with no per-request encoding work
+_FLOW_PATH = Path(__file__).parent / "flow.png"
+
 # === MCP SERVER INITIALIZATION ===
-print("[MCP Server] Initializing...")
+logger.info("[MCP Server] Initializing...")
 # FastMCP server listens on 0.0.0.0:8005 for agent connections
 mcp = FastMCP(
     name="users-management-mcp-server",
@@ -34,12 +59,113 @@ mcp = FastMCP(
 )
 # UserClient wraps HTTP calls to User Service (Docker, port 8041)
 user_client = UserClient()
-print("[MCP Server] FastMCP and UserClient initialized.")
+logger.info("[MCP Server] FastMCP and UserClient initialized.")
+
+# FastMCP validates tool arguments against the signature types only: top-level fields (str,
+# float, ...) are checked, but address/credit_card are exposed as untyped objects
+# ({"additionalProperties": true}), so their contents arrive unchecked. With this flag on,
+# request models are built with model_construct() (no second pass over the already-checked
+# scalars) after the nested dicts are validated with the Address/CreditCard adapters below.
+# Set to False to run full Pydantic validation over the whole payload instead.
+TRUSTED_TOOL_INPUTS = True
+
+
+# Send add/update bodies as MessagePack instead of JSON. Only enable when the User Service
+# accepts application/msgpack; JSON is the default and the fallback
+USER_SERVICE_BINARY = os.getenv("USER_SERVICE_BINARY", "0") == "1"
+if USER_SERVICE_BINARY:
+    import msgpack
+
+
+@lru_cache(maxsize=None)
+def _adapter_for(model_cls: type) -> TypeAdapter:
+    """Build the TypeAdapter for a model once; validation schema compilation is not repeated per call."""
+    return TypeAdapter(model_cls)
+
+
+# Adapters for the validating path (TRUSTED_TOOL_INPUTS = False), created at import
+_SEARCH_ADAPTER = _adapter_for(UserSearchRequest)
+_USERCREATE_ADAPTER = _adapter_for(UserCreate)
+_USERUPDATE_ADAPTER = _adapter_for(UserUpdate)
+# Nested-object adapters: FastMCP's schema doesn't constrain these, so they are always validated
+_NESTED_ADAPTERS = {
+    "address": _adapter_for(Address),
+    "credit_card": _adapter_for(CreditCard),
+}
+
+
+def _validate_nested(provided: dict) -> dict:
+    """
+    Validate provided address/credit_card dicts in place, replacing them with model instances.
+    
+    Raises:
+        ValidationError: If a nested object has missing, extra or mistyped fields
+    """
+    for name, adapter in _NESTED_ADAPTERS.items():
+        if name in provided:
+            provided[name] = adapter.validate_python(provided[name])
+    return provided
+
+
+def _user_to_dict(user: BaseModel) -> dict:
+    """
+    Request body for a UserCreate/UserUpdate: only the fields the caller provided.
+    
+    Equivalent to model_dump(exclude_unset=True) without Pydantic's generic dump machinery: tool
+    handlers build models from provided (non-None) arguments only, so __pydantic_fields_set__ is
+    exactly the body. Unset optional fields, and nested address/credit_card when omitted, are
+    never touched. Nested values are the Address/CreditCard models from _validate_nested().
+    Fields are emitted in model declaration order (fields set is an unordered set), so the
+    body bytes are deterministic and match model_dump's key order.
+    """
+    fields_set = user.__pydantic_fields_set__
+    return {name: getattr(user, name) for name in type(user).model_fields if name in fields_set}
+
+
+def _encode_user_body(user: BaseModel, adapter: TypeAdapter) -> tuple[bytes, str]:
+    """
+    Encode the provided fields of a request model as (body, Content-Type) for UserClient.
+    
+    Trusted path: the fields_set dict is encoded directly (already-validated nested models are
+    handled by to_json()/to_jsonable_python() without a full model dump). Validating path: the
+    model is fully typed, so the adapter's compiled serializer (built once at import) dumps it
+    straight to the wire format with exclude_unset, with no intermediate dict.
+    """
+    if TRUSTED_TOOL_INPUTS:
+        body = _user_to_dict(user)
+        if USER_SERVICE_BINARY:
+            # msgpack packs builtins only: nested models are converted to plain dicts first
+            return msgpack.packb(to_jsonable_python(body), use_bin_type=True), "application/msgpack"
+        # Pydantic's Rust JSON encoder handles the nested models directly
+        return to_json(body), "application/json"
+    if USER_SERVICE_BINARY:
+        # msgpack packs builtins only: mode="json" turns nested models into plain dicts
+        payload = adapter.dump_python(user, mode="json", exclude_unset=True)
+        return msgpack.packb(payload, use_bin_type=True), "application/msgpack"
+    return adapter.dump_json(user, exclude_unset=True), "application/json"
+
+
+# Recent search_user results, LRU-ordered. Entries expire with their 30s TTL bucket and are
+# dropped on every successful add/update/delete (the write generation is part of the key)
+SEARCH_CACHE_TTL = 30
+SEARCH_CACHE_SIZE = 256
+_search_cache: OrderedDict[tuple, str] = OrderedDict()
+_search_generation = 0
+
+
+def _invalidate_searches():
+    """Make every cached search result unreachable after a write to the User Service."""
+    global _search_generation
+    _search_generation += 1
+    _search_cache.clear()
 
 
 # ==================== TOOLS ====================
 # MCP tools are async functions that return strings (formatted data for LLM)
 # Each tool will be discovered by agent and exposed for LLM tool calling
+# Tools must stay `async def` and await their result: FastMCP awaits a tool only when the
+# function itself is a coroutine function, so a plain `def` returning a coroutine would hand
+# the unawaited coroutine object to content conversion instead of its string result
 
 @mcp.tool()
 async def get_user_by_id(user_id: int) -> str:
@@ -55,7 +181,8 @@ async def get_user_by_id(user_id: int) -> str:
     Error handling:
         Raises if user not found (HTTP 404) or service unavailable
     """
-    print(f"[TOOL] get_user_by_id called with user_id={user_id}")
+    logger.debug("[TOOL] get_user_by_id user_id=%s", user_id)
+    # Concurrent lookups of the same ID already share one in-flight request inside UserClient
     return await user_client.get_user(user_id)
 
 @mcp.tool()
@@ -72,8 +199,12 @@ async def delete_user(user_id: int) -> str:
     Error handling:
         Raises if user not found or service unavailable
     """
-    print(f"[TOOL] delete_user called with user_id={user_id}")
-    return await user_client.delete_user(user_id)
+    logger.debug("[TOOL] delete_user user_id=%s", user_id)
+    try:
+        return await user_client.delete_user(user_id)
+    finally:
+        # The delete may have applied even if the call timed out or raised
+        _invalidate_searches()
 
 @mcp.tool()
 async def search_user(
@@ -99,10 +230,30 @@ async def search_user(
         
     Notes:
         - All parameters are optional; omit to ignore that criterion
-        - Returns count of found users in console for debugging
+        - Count of found users is logged at DEBUG level (LOG_LEVEL=DEBUG)
     """
-    print(f"[TOOL] search_user called with name={name}, surname={surname}, email={email}, gender={gender}")
-    return await user_client.search_users(name=name, surname=surname, email=email, gender=gender)
+    logger.debug("[TOOL] search_user name=%s surname=%s email=%s gender=%s", name, surname, email, gender)
+    if not TRUSTED_TOOL_INPUTS:
+        search = _SEARCH_ADAPTER.validate_python(
+            {"name": name, "surname": surname, "email": email, "gender": gender}
+        )
+        name, surname, email, gender = search.name, search.surname, search.email, search.gender
+    # Provided criteria only, built in one pass; the same dict feeds the cache key and the client
+    params = {
+        k: v for k, v in (("name", name), ("surname", surname), ("email", email), ("gender", gender))
+        if v is not None
+    }
+    # Key: write generation + 30s TTL bucket + criteria (all hashable); errors are never cached
+    key = (_search_generation, int(time.monotonic() // SEARCH_CACHE_TTL), *params.items())
+    cached = _search_cache.get(key)
+    if cached is not None:
+        _search_cache.move_to_end(key)
+        return cached
+    result = await user_client.search_users(**params)
+    _search_cache[key] = result
+    if len(_search_cache) > SEARCH_CACHE_SIZE:
+        _search_cache.popitem(last=False)  # Evict least recently used
+    return result
 
 @mcp.tool()
 async def add_user(
@@ -143,24 +294,38 @@ async def add_user(
     Error handling:
         Raises if email already exists or service unavailable
     """
-    print(f"[TOOL] add_user called with email={email}")
-    address_obj = Address(**address) if address else None
-    credit_card_obj = CreditCard(**credit_card) if credit_card else None
-
-    user = UserCreate(
-        name=name,
-        surname=surname,
-        email=email,
-        about_me=about_me,
-        phone=phone,
-        date_of_birth=date_of_birth,
-        gender=gender,
-        company=company,
-        salary=salary,
-        address=address_obj,
-        credit_card=credit_card_obj
-    )
-    return await user_client.add_user(user)
+    logger.debug("[TOOL] add_user email=%s", email)
+    fields = {
+        "name": name,
+        "surname": surname,
+        "email": email,
+        "about_me": about_me,
+        "phone": phone,
+        "date_of_birth": date_of_birth,
+        "gender": gender,
+        "company": company,
+        "salary": salary,
+        "address": address,
+        "credit_card": credit_card
+    }
+    # Only provided arguments become model fields (the exclude_unset view of the request),
+    # on both paths, so the body never carries fields the caller didn't touch. An empty
+    # address/credit_card object ({}) counts as not provided, as LLMs often send one
+    provided = {k: v for k, v in fields.items() if v is not None and v != {}}
+    if TRUSTED_TOOL_INPUTS:
+        # Scalars were type-checked by FastMCP; nested address/credit_card were not, so validate
+        # those before building the model without a second pass over the rest
+        user = UserCreate.model_construct(**_validate_nested(provided))
+    else:
+        # Single validation pass over the provided payload (nested dicts included)
+        user = _USERCREATE_ADAPTER.validate_python(provided)
+    # Serialize only the provided fields (JSON, or MessagePack if enabled); UserClient sends the body as-is
+    body, content_type = _encode_user_body(user, _USERCREATE_ADAPTER)
+    try:
+        return await user_client.add_user(body, content_type=content_type)
+    finally:
+        # The write may have applied even if the call timed out or raised
+        _invalidate_searches()
 
 @mcp.tool()
 async def update_user(
@@ -189,28 +354,49 @@ async def update_user(
     Error handling:
         Raises if user not found (HTTP 404) or service unavailable
     """
-    print(f"[TOOL] update_user called for user_id={user_id}")
-    address_obj = Address(**address) if address else None
-    credit_card_obj = CreditCard(**credit_card) if credit_card else None
-
-    user_update = UserUpdate(
-        name=name,
-        surname=surname,
-        email=email,
-        phone=phone,
-        date_of_birth=date_of_birth,
-        gender=gender,
-        company=company,
-        salary=salary,
-        address=address_obj,
-        credit_card=credit_card_obj
-    )
-    return await user_client.update_user(user_id, user_update)
+    logger.debug("[TOOL] update_user user_id=%s", user_id)
+    fields = {
+        "name": name,
+        "surname": surname,
+        "email": email,
+        "phone": phone,
+        "date_of_birth": date_of_birth,
+        "gender": gender,
+        "company": company,
+        "salary": salary,
+        "address": address,
+        "credit_card": credit_card
+    }
+    # Only provided arguments become model fields (the exclude_unset view of the request),
+    # on both paths, so the body never carries fields the caller didn't touch. An empty
+    # address/credit_card object ({}) counts as not provided, as LLMs often send one
+    provided = {k: v for k, v in fields.items() if v is not None and v != {}}
+    if TRUSTED_TOOL_INPUTS:
+        # Scalars were type-checked by FastMCP; nested address/credit_card were not, so validate
+        # those before building the model without a second pass over the rest
+        user_update = UserUpdate.model_construct(**_validate_nested(provided))
+    else:
+        # Single validation pass over the provided payload (nested dicts included)
+        user_update = _USERUPDATE_ADAPTER.validate_python(provided)
+    # Only provided fields are sent (PATCH semantics), as JSON or MessagePack
+    body, content_type = _encode_user_body(user_update, _USERUPDATE_ADAPTER)
+    try:
+        return await user_client.update_user(user_id, body, content_type=content_type)
+    finally:
+        # The write may have applied even if the call timed out or raised
+        _invalidate_searches()
 
 # ==================== MCP RESOURCES ====================
 # Resources are static assets (images, docs, etc.) that agents can retrieve
 # Not all servers have resources; this one provides a flow diagram
 
+# The diagram is immutable: read it once at import and serve the same bytes object to every request
+try:
+    _FLOW_PNG_BYTES: Optional[bytes] = _FLOW_PATH.read_bytes()
+except FileNotFoundError:
+    logger.warning("[MCP Server] flow.png not found; flow-diagram resource will fail until it exists.")
+    _FLOW_PNG_BYTES = None
+
 @mcp.resource(uri="users-management://flow-diagram", mime_type="image/png")
 async def get_flow_diagram() -> bytes:
     """
@@ -223,74 +409,23 @@ async def get_flow_diagram() -> bytes:
         bytes: PNG image data loaded from flow.png file
         
     Notes:
-        - File must exist at mcp_server/flow.png
+        - File must exist at mcp_server/flow.png (loaded once at import)
         - Useful for showing API endpoints available in User Service
     """
-    print("[RESOURCE] get_flow_diagram called, returning flow.png bytes.")
-    flow_path = Path(__file__).parent / "flow.png"
-    with open(flow_path, "rb") as f:
-        return f.read()
+    logger.debug("[RESOURCE] get_flow_diagram called, returning flow.png bytes.")
+    if _FLOW_PNG_BYTES is not None:
+        return _FLOW_PNG_BYTES
+    # Not present at import: read from disk (raises FileNotFoundError if still missing)
+    return _FLOW_PATH.read_bytes()
 
 
 # ==================== MCP PROMPTS ====================
 # Prompts provide domain-specific guidance to LLM clients
 # These are discoverable by agents and can be included in message history
+# Prompt texts are static: defined once as module constants, handlers just return them
 
-@mcp.prompt()
-async def search_helper_prompt() -> str:
-    """
-    Provide guidance for formulating effective user search queries.
-    
-    This prompt is included in agent message history to guide LLM on:
-    - Available search fields (name, surname, email, gender)
-    - Partial matching semantics (case-insensitive)
-    - Example search patterns and combinations
-    - Best practices for targeted searches
-    
-    Returns:
-        str: Multi-line guidance text for LLM
-    """
-    return (
-        "You are helping users search through a dynamic user database. The database contains "
-        "realistic synthetic user profiles with the following searchable fields:\n"
-        "\n## Available Search Parameters\n"
-        "- **name**: First name (partial matching, case-insensitive)\n"
-        "- **surname**: Last name (partial matching, case-insensitive)\n"
-        "- **email**: Email address (partial matching, case-insensitive)\n"
-        "- **gender**: Exact match (male, female, other, prefer_not_to_say)\n"
-        "\n## Search Strategy Guidance\n"
-        "... (see README for full text) ..."
-    )
-
-@mcp.prompt()
-async def profile_creator_prompt() -> str:
-    """
-    Provide guidance for creating realistic user profiles.
-    
-    This prompt is included in agent message history to guide LLM on:
-    - Required fields (name, surname, email, about_me)
-    - Optional fields (phone, date_of_birth, address, company, credit card)
-    - Data validation rules (format, constraints, uniqueness)
-    - Realistic value ranges (salary, age distribution)
-    - Cultural sensitivity and diversity best practices
-    
-    Returns:
-        str: Multi-line guidance text for LLM
-    """
-    return (
-        "You are helping create realistic user profiles for the system. Follow these guidelines "
-        "to ensure data consistency and realism.\n"
-        "\n## Required Fields\n"
-        "- **name**: 2-50 characters, letters only, culturally appropriate\n"
-        "- **surname**: 2-50 characters, letters only  \n"
-        "- **email**: Valid format, must be unique in system\n"
-        "- **about_me**: Rich, realistic biography (see guidelines below)\n"
-        "... (see README for full text) ..."
-    )
-
-# Reference text (kept for documentation, not returned as prompt)
-"""
-You are helping users search through a dynamic user database. The database contains 
+# Guides formulation of effective user search queries
+_SEARCH_HELPER_TEXT = """You are helping users search through a dynamic user database. The database contains 
 realistic synthetic user profiles with the following searchable fields:
 
 ## Available Search Parameters
@@ -339,10 +474,8 @@ When helping users search, suggest multiple search strategies and explain
 why certain approaches might be more effective for their goals.
 """
 
-
 # Guides creation of realistic user profiles
-"""
-You are helping create realistic user profiles for the system. Follow these guidelines 
+_PROFILE_CREATOR_TEXT = """You are helping create realistic user profiles for the system. Follow these guidelines 
 to ensure data consistency and realism.
 
 ## Required Fields
@@ -413,6 +546,40 @@ When creating profiles, aim for diversity in:
 """
 
 
+@mcp.prompt()
+async def search_helper_prompt() -> str:
+    """
+    Provide guidance for formulating effective user search queries.
+    
+    This prompt is included in agent message history to guide LLM on:
+    - Available search fields (name, surname, email, gender)
+    - Partial matching semantics (case-insensitive)
+    - Example search patterns and combinations
+    - Best practices for targeted searches
+    
+    Returns:
+        str: Multi-line guidance text for LLM
+    """
+    return _SEARCH_HELPER_TEXT
+
+@mcp.prompt()
+async def profile_creator_prompt() -> str:
+    """
+    Provide guidance for creating realistic user profiles.
+    
+    This prompt is included in agent message history to guide LLM on:
+    - Required fields (name, surname, email, about_me)
+    - Optional fields (phone, date_of_birth, address, company, credit card)
+    - Data validation rules (format, constraints, uniqueness)
+    - Realistic value ranges (salary, age distribution)
+    - Cultural sensitivity and diversity best practices
+    
+    Returns:
+        str: Multi-line guidance text for LLM
+    """
+    return _PROFILE_CREATOR_TEXT
+
+
 # ==================== SERVER ENTRY POINT ====================
 if __name__ == "__main__":
     """
@@ -430,6 +597,14 @@ if __name__ == "__main__":
     
     To stop: Ctrl+C or systemctl stop
     """
-    print("[MCP Server] Starting server on 0.0.0.0:8005 with streamable-http transport...")
-    mcp.run(transport="streamable-http", mount_path="/mcp")
-    print("[MCP Server] Server stopped.")
+    async def _serve():
+        # Same transport as mcp.run(transport="streamable-http") (served at /mcp), plus a
+        # shutdown hook that closes the User Service connection pool on the server's own loop
+        try:
+            await mcp.run_streamable_http_async()
+        finally:
+            await user_client.aclose()
+
+    logger.info("[MCP Server] Starting server on 0.0.0.0:8005 with streamable-http transport...")
+    asyncio.run(_serve())
+    logger.info("[MCP Server] Server stopped.")
@@ -2,35 +2,109 @@
 User Management REST Client
 
 HTTP client wrapper for the User Service API (Docker, localhost:8041). Provides async methods
-for user CRUD operations (get, search, create, update, delete). Formats responses as code-block
-strings for LLM consumption via MCP server tools.
+for user CRUD operations (get, search, create, update, delete) over a non-blocking
+httpx.AsyncClient. Formats responses as code-block strings for LLM consumption via MCP server tools.
 
 EXECUTION FLOW:
-1. Each method constructs GET/POST/PUT/DELETE request to User Service endpoint
-2. Sets JSON content-type header and passes query params or request body
+1. Each method awaits a GET/POST/PUT/DELETE request on the shared AsyncClient (event loop stays free)
+2. JSON content-type header is set once on the client; passes query params or request body
 3. Raises exception on HTTP error (4xx/5xx); returns string on success (200/201/204)
 4. Formats JSON responses via __user_to_string() / __users_to_string() for readability
+   (_get_user_raw() / _search_users_raw() return the parsed JSON for internal callers)
 5. Returns markdown code blocks so LLM can read structured user data
+6. Independent lookups (get_users_bulk) are awaited together with asyncio.gather
 
 Error handling:
-- Network failures raise exceptions (user_client.py doesn't retry)
+- Idempotent requests (GET/DELETE) are retried up to RETRY_ATTEMPTS times with exponential
+  backoff on connection errors and 502/503/504 (GET also on read timeouts); retries share a
+  RETRY_DEADLINE seconds budget per call; POST/PUT are never retried
+- Network failures that outlast the retries raise exceptions
+- Every request has a time budget (_TIMEOUT: 1s connect/pool, 5s read/write); methods take a
+  per-call `timeout` override; exceeding it raises httpx.TimeoutException
 - HTTP errors (404, 500, etc.) include status code + response body
 - Success codes: 200 (GET), 201 (POST/PUT), 204 (DELETE with no body)
 
+Caching:
+- get_user() responses are cached per user ID (LRU of USER_CACHE_SIZE, USER_CACHE_TTL seconds)
+- update_user()/delete_user() invalidate the affected ID; errors are never cached
+- Writes made outside this client (other services) are visible after at most USER_CACHE_TTL
+
 External dependencies:
 - User Service REST API on localhost:8041 (configurable via USERS_MANAGEMENT_SERVICE_URL)
 - Docker container must be running: docker-compose up -d
 """
+import asyncio
+import io
+import logging
 import os
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Any, Optional
 
-import requests
+import httpx
+
+
+logger = logging.getLogger(__name__)
 
-from models.user_info import UserUpdate, UserCreate
 
 # User Service endpoint from env var with default to localhost (for local dev/testing)
 USER_SERVICE_ENDPOINT = os.getenv("USERS_MANAGEMENT_SERVICE_URL", "http://localhost:8041")
 
+# Formatted get_user() responses are cached per user ID (LRU, short TTL); writes through this
+# client (update_user/delete_user) drop the affected entry
+USER_CACHE_SIZE = 256
+USER_CACHE_TTL = 30.0
+
+# Request paths (relative to USER_SERVICE_ENDPOINT) and headers, built once at import
+_USERS_PATH = "/v1/users"
+_SEARCH_PATH = _USERS_PATH + "/search"
+_JSON_HEADERS = MappingProxyType({"Content-Type": "application/json"})
+
+
+# Default time budget for every request: fail fast on connect/pool waits, bounded read/write.
+# Public methods accept a per-call `timeout` override (e.g. for long-running searches)
+_TIMEOUT = httpx.Timeout(connect=1.0, read=5.0, write=5.0, pool=1.0)
+
+
+def _timeout_or_default(timeout: Optional[httpx.Timeout | float]) -> httpx.Timeout | float:
+    """Per-call timeout override, or the client-wide _TIMEOUT when None."""
+    return _TIMEOUT if timeout is None else timeout
+
+
+def _clamp_timeout(timeout: httpx.Timeout | float, remaining: float) -> httpx.Timeout | float:
+    """Timeout whose every phase (connect/read/write/pool) ends within `remaining` seconds."""
+    if not isinstance(timeout, httpx.Timeout):
+        return min(timeout, remaining)
+    return httpx.Timeout(
+        connect=remaining if timeout.connect is None else min(timeout.connect, remaining),
+        read=remaining if timeout.read is None else min(timeout.read, remaining),
+        write=remaining if timeout.write is None else min(timeout.write, remaining),
+        pool=remaining if timeout.pool is None else min(timeout.pool, remaining),
+    )
+
+
+# Bounded retry for transient failures: only idempotent methods, backoff 50ms, 100ms, 200ms.
+# RETRY_DEADLINE caps the whole call: retries start only while it has budget left, and each
+# retry's timeout is clamped to what remains (the first attempt keeps its full timeout)
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 0.05
+RETRY_DEADLINE = 6.0
+_RETRY_STATUSES = frozenset({502, 503, 504})
+# A read timeout means the request reached the service (and a DELETE may have applied), so only
+# GET is retried on it; DELETE is retried only when the request never got through
+_RETRY_EXCEPTIONS = MappingProxyType({
+    "GET": (httpx.ConnectError, httpx.ReadTimeout),
+    "DELETE": (httpx.ConnectError,),
+})
+
+
+@lru_cache(maxsize=None)
+def _content_type_headers(content_type: str) -> MappingProxyType:
+    """Read-only Content-Type header mapping, created once per distinct body encoding."""
+    return MappingProxyType({"Content-Type": content_type})
+
 class UserClient:
     """
     HTTP client for User Service REST API.
@@ -41,13 +115,84 @@ class UserClient:
     - Raise exceptions on HTTP errors (4xx/5xx)
     - Return string results (not raw JSON) for consumption by MCP server
     
-    Note: Methods are marked async for consistency with MCP server pattern, but use
-    synchronous requests.get/post/put/delete. A future refactor could use httpx or aiohttp
-    for true async HTTP (see TODO below).
-    
-    TODO: Migrate to aiohttp or httpx for true async I/O instead of blocking requests.
+    All requests go through one httpx.AsyncClient, so concurrent MCP tool calls overlap their
+    User Service round trips instead of blocking the event loop. Call aclose() on shutdown.
     """
 
+    def __init__(self):
+        # Base URL and JSON content type are configured once; call sites pass only paths.
+        # Keep-alive pool: connections are reused across calls (no per-call TCP/TLS setup).
+        # HTTP/2 (multiplexed calls, HPACK-compressed headers) is only negotiated via TLS ALPN, so it
+        # applies to https:// endpoints; the default plain http:// service stays on HTTP/1.1, where
+        # each concurrent call needs its own connection, so every pooled connection is kept alive
+        self._client = httpx.AsyncClient(
+            base_url=USER_SERVICE_ENDPOINT,
+            headers=_JSON_HEADERS,
+            http2=True,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=30.0),
+            timeout=_TIMEOUT
+        )
+        # user_id -> (expires_at monotonic time, formatted user); least recently used first
+        self._user_cache: OrderedDict[int, tuple[float, str]] = OrderedDict()
+        # Bumped on every write so a GET that raced a write never stores its pre-write result
+        self._write_generation = 0
+        # user_id -> running GET task, shared by concurrent callers of get_user(user_id)
+        self._inflight: dict[int, asyncio.Task[str]] = {}
+
+    async def aclose(self):
+        """Close the underlying HTTP client and its pooled connections."""
+        await self._client.aclose()
+
+    async def _request_with_retry(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request, retrying transient failures of idempotent methods.
+        
+        GET is retried up to RETRY_ATTEMPTS times on connection errors, read timeouts and
+        502/503/504; DELETE on connection errors and 502/503/504 only. Tries are spaced by
+        RETRY_BACKOFF * 2**attempt. Retries must finish within RETRY_DEADLINE seconds of the first
+        send: none starts after it, and each retry's timeout is clamped to the time remaining.
+        POST/PUT go out exactly once (no idempotency key). A retried DELETE answered with 404
+        after an earlier attempt reached the service (502/503/504) may have been applied by that
+        attempt, so it is reported as 204; after connect errors only, the 404 is returned as is.
+        
+        Returns:
+            httpx.Response: The first non-retryable response (or the last one after retries)
+            
+        Raises:
+            httpx.ConnectError / httpx.ReadTimeout: If the last attempt still fails
+        """
+        retry_exceptions = _RETRY_EXCEPTIONS.get(method)
+        if retry_exceptions is None:
+            return await self._client.request(method, url, **kwargs)
+
+        timeout = _timeout_or_default(kwargs.pop("timeout", None))
+        deadline = time.monotonic() + RETRY_DEADLINE
+        # An earlier attempt got a response, so the service saw (and may have applied) the request
+        reached_service = False
+        for attempt in range(RETRY_ATTEMPTS + 1):
+            delay = RETRY_BACKOFF * 2 ** attempt
+            last = attempt == RETRY_ATTEMPTS
+            attempt_timeout = timeout if not attempt else _clamp_timeout(timeout, deadline - time.monotonic())
+            try:
+                response = await self._client.request(method, url, timeout=attempt_timeout, **kwargs)
+            except retry_exceptions:
+                if last or time.monotonic() + delay >= deadline:
+                    raise
+            else:
+                if method == "DELETE" and reached_service and response.status_code == 404:
+                    return httpx.Response(204, request=response.request)
+                reached_service = True
+                if last or response.status_code not in _RETRY_STATUSES or time.monotonic() + delay >= deadline:
+                    return response
+            await asyncio.sleep(delay)
+
+    def _invalidate_user(self, user_id: int):
+        """Forget the cached get_user() response for user_id after a write."""
+        self._write_generation += 1
+        self._user_cache.pop(user_id, None)
+        # A GET already in flight may have read the pre-write user: later callers must not join it
+        self._inflight.pop(user_id, None)
+
     def __user_to_string(self, user: dict[str, Any]) -> str:
         """
         Format single user dict as markdown code block.
@@ -66,20 +211,16 @@ class UserClient:
         Returns:
             str: Markdown code block (triple backticks wrapper)
         """
-        user_str = "```\n"
-        # Iterate all user fields with 2-space indent for readability
-        for key, value in user.items():
-            user_str += f"  {key}: {value}\n"
-        user_str += "```\n"
-
-        return user_str
+        # All user fields with 2-space indent for readability, joined in one pass (no repeated +=)
+        return "```\n" + "".join(f"  {key}: {value}\n" for key, value in user.items()) + "```\n"
 
     def __users_to_string(self, users: list[dict[str, Any]]) -> str:
         """
         Format multiple user dicts as concatenated markdown code blocks.
         
         Used by search_users() to return list of matching users.
-        Each user is formatted via __user_to_string(), then joined.
+        Produces the same blocks as __user_to_string(), written field by field into one
+        StringIO buffer (no intermediate per-user strings for large search results).
         
         Args:
             users: List of user dicts from User Service search API
@@ -87,48 +228,124 @@ class UserClient:
         Returns:
             str: Multiple markdown code blocks (one per user), separated by newlines
         """
-        users_str = ""
-        # Concatenate each user's formatted code block
-        for value in users:
-            users_str += self.__user_to_string(value)
-        users_str += "\n"
-
-        return users_str
-
-    async def get_user(self, user_id: int) -> str:
+        buf = io.StringIO()
+        write = buf.write
+        for user in users:
+            write("```\n")
+            for key, value in user.items():
+                write(f"  {key}: {value}\n")
+            write("```\n")
+        write("\n")
+
+        return buf.getvalue()
+
+    async def get_user(self, user_id: int, timeout: Optional[httpx.Timeout | float] = None) -> str:
         """
         Retrieve a single user by ID.
         
-        HTTP GET /v1/users/{user_id} -> parse JSON -> format as code block
+        HTTP GET /v1/users/{user_id} -> parse JSON -> format as code block.
+        Served from the per-ID cache while the entry is younger than USER_CACHE_TTL;
+        concurrent misses for the same ID are coalesced into a single request.
         
         Args:
             user_id: User ID (integer)
+            timeout: Optional per-call timeout (httpx.Timeout or seconds); defaults to _TIMEOUT.
+                     A call that joins an in-flight request for the same ID shares its timeout
             
         Returns:
             str: Markdown code block with user data
             
         Raises:
             Exception: If user not found (404) or service unavailable (5xx)
+            httpx.TimeoutException: If the request exceeds its timeout budget
         """
-        headers = {"Content-Type": "application/json"}
+        cached = self._user_cache.get(user_id)
+        if cached is not None:
+            expires_at, user_str = cached
+            if expires_at > time.monotonic():
+                self._user_cache.move_to_end(user_id)
+                return user_str
+            del self._user_cache[user_id]
+
+        # Concurrent misses for the same ID share one request: the first caller starts a task,
+        # later ones await it. Shielded so a cancelled caller doesn't cancel it for the others
+        task = self._inflight.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_user(user_id, timeout))
+            self._inflight[user_id] = task
+            task.add_done_callback(lambda done: self._forget_inflight(user_id, done))
+        return await asyncio.shield(task)
+
+    def _forget_inflight(self, user_id: int, task: asyncio.Task[str]):
+        """Drop the finished GET for user_id unless a write already replaced it with a newer one."""
+        if self._inflight.get(user_id) is task:
+            del self._inflight[user_id]
+
+    async def _fetch_user(self, user_id: int, timeout: Optional[httpx.Timeout | float]) -> str:
+        """GET one user via _get_user_raw(), format it and store it in the cache."""
+        generation = self._write_generation
+        user_str = self.__user_to_string(await self._get_user_raw(user_id, timeout))
+        # Errors are never cached; neither is a result fetched while a write was happening
+        if generation == self._write_generation:
+            self._user_cache[user_id] = (time.monotonic() + USER_CACHE_TTL, user_str)
+            if len(self._user_cache) > USER_CACHE_SIZE:
+                self._user_cache.popitem(last=False)  # Evict least recently used
+        return user_str
 
+    async def _get_user_raw(self, user_id: int, timeout: Optional[httpx.Timeout | float] = None) -> dict[str, Any]:
+        """
+        Fetch a single user as parsed JSON, without code-block formatting or caching.
+        
+        For programmatic callers inside the server (e.g. checks after a write); MCP tools use
+        get_user(), which formats the result for the LLM.
+        
+        Args:
+            user_id: User ID (integer)
+            timeout: Optional per-call timeout (httpx.Timeout or seconds); defaults to _TIMEOUT
+            
+        Returns:
+            dict[str, Any]: User object as returned by the User Service
+            
+        Raises:
+            Exception: If user not found (404) or service unavailable (5xx)
+        """
         # HTTP GET to fetch single user by ID
-        response = requests.get(url=f"{USER_SERVICE_ENDPOINT}/v1/users/{user_id}", headers=headers)
+        response = await self._request_with_retry("GET", f"{_USERS_PATH}/{user_id}", timeout=_timeout_or_default(timeout))
 
         # Success case: HTTP 200 with JSON user object
         if response.status_code == 200:
-            data = response.json()
-            return self.__user_to_string(data)
+            return response.json()
 
         # Error case: include status code and response body for debugging
         raise Exception(f"HTTP {response.status_code}: {response.text}")
 
+    async def get_users_bulk(self, ids: list[int], timeout: Optional[httpx.Timeout | float] = None) -> str:
+        """
+        Retrieve several users by ID concurrently.
+        
+        Issues one GET /v1/users/{user_id} per ID and awaits them together (asyncio.gather), so
+        N lookups take about one round trip; concurrency is capped by the client's connection limits.
+        
+        Args:
+            ids: User IDs to fetch (results keep this order)
+            timeout: Optional per-lookup timeout (httpx.Timeout or seconds); defaults to _TIMEOUT
+            
+        Returns:
+            str: Markdown code blocks, one per user, in the order of ids
+            
+        Raises:
+            Exception: On the first lookup that fails (404 or service unavailable)
+        """
+        users = await asyncio.gather(*(self.get_user(user_id, timeout) for user_id in ids))
+        return "".join(users) + "\n"
+
     async def search_users(
             self,
             name: Optional[str] = None,
             surname: Optional[str] = None,
             email: Optional[str] = None,
             gender: Optional[str] = None,
+            timeout: Optional[httpx.Timeout | float] = None,
     ) -> str:
         """
         Search for users by partial criteria (name, surname, email, gender).
@@ -143,62 +360,86 @@ class UserClient:
             surname: Optional partial last name
             email: Optional partial email (e.g., 'gmail' matches all Gmail users)
             gender: Optional exact gender
+            timeout: Optional per-call timeout (httpx.Timeout or seconds); defaults to _TIMEOUT
             
         Returns:
             str: Markdown code blocks with all matching users (can be empty if no matches)
             
+        Raises:
+            Exception: If service unavailable (5xx)
+            httpx.TimeoutException: If the request exceeds its timeout budget
+        """
+        data = await self._search_users_raw(name=name, surname=surname, email=email, gender=gender, timeout=timeout)
+        # Result count for debugging; formatted only when DEBUG is enabled (no stdout write per call)
+        logger.debug("search_users: %d results", len(data))
+        return self.__users_to_string(data)
+
+    async def _search_users_raw(
+            self,
+            name: Optional[str] = None,
+            surname: Optional[str] = None,
+            email: Optional[str] = None,
+            gender: Optional[str] = None,
+            timeout: Optional[httpx.Timeout | float] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Search for users and return the parsed JSON list, without code-block formatting.
+        
+        Same criteria and semantics as search_users(); for programmatic callers inside the server.
+        
+        Returns:
+            list[dict[str, Any]]: Matching user objects (empty if no matches)
+            
         Raises:
             Exception: If service unavailable (5xx)
         """
-        headers = {"Content-Type": "application/json"}
-
-        # Build query params: only include non-None criteria
-        params = {}
-        if name:
-            params["name"] = name
-        if surname:
-            params["surname"] = surname
-        if email:
-            params["email"] = email
-        if gender:
-            params["gender"] = gender
+        # Build query params in one pass: only include non-empty criteria (no query string if none)
+        params = {
+            k: v for k, v in (("name", name), ("surname", surname), ("email", email), ("gender", gender))
+            if v
+        }
 
         # HTTP GET with query params to search endpoint
-        response = requests.get(url=USER_SERVICE_ENDPOINT + "/v1/users/search", headers=headers, params=params)
+        response = await self._request_with_retry("GET", _SEARCH_PATH, params=params, timeout=_timeout_or_default(timeout))
 
         # Success: HTTP 200 with JSON array of matching users
         if response.status_code == 200:
-            data = response.json()
-            # Print count for user feedback during tool execution
-            print(f"Get {len(data)} users successfully")
-            return self.__users_to_string(data)
+            return response.json()
 
         # Error case: include status code and response body
         raise Exception(f"HTTP {response.status_code}: {response.text}")
 
-    async def add_user(self, user_create_model: UserCreate) -> str:
+    async def add_user(
+            self,
+            user_body: str | bytes,
+            content_type: str = "application/json",
+            timeout: Optional[httpx.Timeout | float] = None,
+    ) -> str:
         """
         Create a new user.
         
-        HTTP POST /v1/users with UserCreate Pydantic model (serialized to JSON).
+        HTTP POST /v1/users with a pre-serialized UserCreate body.
         
         Args:
-            user_create_model: UserCreate Pydantic model with required fields
-                              (name, surname, email, etc.)
+            user_body: UserCreate model already serialized by the caller (only provided fields);
+                       sent without re-encoding
+            content_type: Body encoding: application/json (default) or application/msgpack
+            timeout: Optional per-call timeout (httpx.Timeout or seconds); defaults to _TIMEOUT
             
         Returns:
             str: Confirmation message with created user data
             
         Raises:
             Exception: If email already exists (conflict) or validation fails (4xx/5xx)
+            httpx.TimeoutException: If the request exceeds its timeout budget
         """
-        headers = {"Content-Type": "application/json"}
-
-        # HTTP POST with JSON body containing new user data
-        response = requests.post(
-            url=f"{USER_SERVICE_ENDPOINT}/v1/users",
-            headers=headers,
-            json=user_create_model.model_dump()  # Pydantic model -> dict -> JSON
+        # HTTP POST with encoded body containing new user data
+        response = await self._request_with_retry(
+            "POST",
+            _USERS_PATH,
+            headers=_content_type_headers(content_type),
+            content=user_body,  # Already encoded: no dict walk / stdlib json encode here
+            timeout=_timeout_or_default(timeout)
         )
 
         # Success: HTTP 201 Created with new user data in response
@@ -208,31 +449,46 @@ class UserClient:
         # Error case: unique constraint, validation, or server error
         raise Exception(f"HTTP {response.status_code}: {response.text}")
 
-    async def update_user(self, user_id: int, user_update_model: UserUpdate) -> str:
+    async def update_user(
+            self,
+            user_id: int,
+            user_body: str | bytes,
+            content_type: str = "application/json",
+            timeout: Optional[httpx.Timeout | float] = None,
+    ) -> str:
         """
         Update an existing user by ID.
         
-        HTTP PUT /v1/users/{user_id} with UserUpdate Pydantic model.
-        Only fields present in the model are updated (PATCH-like semantics).
+        HTTP PUT /v1/users/{user_id} with a pre-serialized UserUpdate body.
+        Only fields present in the body are updated (PATCH-like semantics).
         
         Args:
             user_id: ID of user to update
-            user_update_model: UserUpdate Pydantic model with optional fields to update
+            user_body: UserUpdate model already serialized by the caller
+                       (only fields to update); sent without re-encoding
+            content_type: Body encoding: application/json (default) or application/msgpack
+            timeout: Optional per-call timeout (httpx.Timeout or seconds); defaults to _TIMEOUT
             
         Returns:
             str: Confirmation message with updated user data
             
         Raises:
             Exception: If user not found (404), validation fails (4xx), or service unavailable (5xx)
+            httpx.TimeoutException: If the request exceeds its timeout budget
         """
-        headers = {"Content-Type": "application/json"}
-
-        # HTTP PUT to update user by ID with JSON body
-        response = requests.put(
-            url=f"{USER_SERVICE_ENDPOINT}/v1/users/{user_id}",
-            headers=headers,
-            json=user_update_model.model_dump()  # Pydantic model -> dict -> JSON
-        )
+        try:
+            # HTTP PUT to update user by ID with encoded body
+            response = await self._request_with_retry(
+                "PUT",
+                f"{_USERS_PATH}/{user_id}",
+                headers=_content_type_headers(content_type),
+                content=user_body,  # Already encoded: no dict walk / stdlib json encode here
+                timeout=_timeout_or_default(timeout)
+            )
+        finally:
+            # Cached view of this user is stale whatever the outcome (the write may have applied
+            # even if the response timed out)
+            self._invalidate_user(user_id)
 
         # Success: HTTP 201 with updated user data
         if response.status_code == 201:
@@ -241,7 +497,7 @@ class UserClient:
         # Error case: user not found, validation error, or server error
         raise Exception(f"HTTP {response.status_code}: {response.text}")
 
-    async def delete_user(self, user_id: int) -> str:
+    async def delete_user(self, user_id: int, timeout: Optional[httpx.Timeout | float] = None) -> str:
         """
         Delete a user by ID.
         
@@ -249,17 +505,23 @@ class UserClient:
         
         Args:
             user_id: ID of user to delete
+            timeout: Optional per-call timeout (httpx.Timeout or seconds); defaults to _TIMEOUT
             
         Returns:
             str: Confirmation message "User successfully deleted"
             
         Raises:
             Exception: If user not found (404) or service unavailable (5xx)
+            httpx.TimeoutException: If the request exceeds its timeout budget
         """
-        headers = {"Content-Type": "application/json"}
-
-        # HTTP DELETE to remove user by ID
-        response = requests.delete(url=f"{USER_SERVICE_ENDPOINT}/v1/users/{user_id}", headers=headers)
+        try:
+            # HTTP DELETE to remove user by ID
+            response = await self._request_with_retry(
+                "DELETE", f"{_USERS_PATH}/{user_id}", timeout=_timeout_or_default(timeout)
+            )
+        finally:
+            # The delete may have applied even if the response timed out
+            self._invalidate_user(user_id)
 
         # Success: HTTP 204 No Content (no response body, user is deleted)
         if response.status_code == 204: